@@ -19,6 +19,11 @@ if sys.platform == 'win32':
 
 import json
 import time
+import queue
+import logging
+import logging.handlers
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from datetime import datetime
@@ -31,6 +36,8 @@ load_dotenv()
 # 添加模組路徑
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+logger = logging.getLogger(__name__)
+
 from pose_detection.detector import PoseDetector
 from pose_detection.fall_detector import FallDetector, AlertSeverity
 from pose_detection.utils import (
@@ -53,6 +60,21 @@ class ElderlyFallDetectionSystem:
     5. LINE Bot 警示通知
     """
 
+    # 固定屬性配置：避免 __dict__ 查找並防止誤植新屬性
+    __slots__ = (
+        'config', 'config_path', 'pose_detector', 'fall_detector', 'notifier',
+        'camera_id', 'frame_width', 'frame_height', 'target_fps',
+        'skip_stale_frames', 'detect_scale', 'detect_stride',
+        'headless', 'draw_skeleton_stride', '_calibrate_requested',
+        '_panel_width', '_panel_height', '_panel_bg',
+        'screenshot_dir', 'is_running', 'cap',
+        'fps_counter', 'fps_start_time', 'current_fps',
+        '_frame_idx', '_last_detected', '_last_detection_result',
+        '_last_ts_sec', '_last_ts_str', '_rgb_buf',
+        '_read_q', '_alert_q', '_writer_q', '_stop_event',
+        '_capture_thread', '_alert_thread', '_writer_thread',
+    )
+
     def __init__(self, config_path: str = None):
         """
         初始化系統
@@ -68,13 +90,20 @@ class ElderlyFallDetectionSystem:
         self.config_path = config_path
 
         # 初始化姿勢偵測器
+        # fast_mode 使用 MediaPipe Lite 模型（model_complexity=0），
+        # CPU 上推論約快 2 倍，全身姿勢的精度損失極小
+        fast_mode = self.config.get('detection', {}).get('fast_mode', True)
         self.pose_detector = PoseDetector(
+            model_complexity=0 if fast_mode else 1,
             min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+            min_tracking_confidence=0.5,
+            backend=self.config.get('detection', {}).get('backend', 'mediapipe_cpu')
         )
 
         # 初始化跌倒偵測器
         detection_config = self.config.get('detection', {})
+        # 每 N 幀才跑一次姿勢偵測（擷取仍維持全速以降低延遲）
+        self.detect_stride = max(1, detection_config.get('detect_every_n', 2))
         self.fall_detector = FallDetector(
             torso_angle_threshold=detection_config.get('torso_angle_threshold', 35),
             head_drop_threshold=detection_config.get('head_drop_threshold', 100) / 480,  # 正規化
@@ -93,6 +122,23 @@ class ElderlyFallDetectionSystem:
         self.frame_width = cam_config.get('width', 640)
         self.frame_height = cam_config.get('height', 480)
         self.target_fps = cam_config.get('fps', 30)
+        # 是否在 retrieve 前額外 grab 掉堆積的舊幀（RTSP/MJPEG 串流適用）
+        self.skip_stale_frames = cam_config.get('skip_stale_frames', False)
+        # 姿勢偵測輸入的縮放比例（MediaPipe 內部會再縮到 256x256，
+        # 先縮小可省下前處理的色彩轉換與記憶體頻寬；顯示與截圖仍用原解析度）
+        self.detect_scale = cam_config.get('detect_scale', 0.5)
+
+        # 顯示設定（headless 模式不繪製面板、不開視窗，適合遠端或嵌入式部署）
+        display_config = self.config.get('display', {})
+        self.headless = display_config.get('headless', False)
+        # 每 N 個顯示幀才繪製骨架（1 = 每幀繪製；調高可省下 cv2.line/circle 成本）
+        self.draw_skeleton_stride = max(1, display_config.get('draw_skeleton_every_n', 1))
+        self._calibrate_requested = False
+
+        # 預先建立資訊面板的黑色底圖（固定內容，避免每幀重新產生）
+        self._panel_width = 250
+        self._panel_height = 200
+        self._panel_bg = self._build_panel_bg()
 
         # 截圖目錄
         self.screenshot_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
@@ -104,6 +150,25 @@ class ElderlyFallDetectionSystem:
         self.fps_counter = 0
         self.fps_start_time = time.time()
         self.current_fps = 0
+        self._frame_idx = 0
+        self._last_detected = False
+        self._last_detection_result = None
+
+        # 秒級時間戳快取（strftime 偏慢，同一秒內重複使用）
+        self._last_ts_sec = 0
+        self._last_ts_str = ''
+
+        # 姿勢偵測用的 RGB 轉換緩衝區（依實際偵測輸入尺寸延遲配置）
+        self._rgb_buf: Optional[np.ndarray] = None
+
+        # 管線執行緒（擷取 / 警報 / 截圖寫檔），以有界佇列連接避免堆積
+        self._read_q: queue.Queue = queue.Queue(maxsize=2)
+        self._alert_q: queue.Queue = queue.Queue(maxsize=2)
+        self._writer_q: queue.Queue = queue.Queue(maxsize=4)
+        self._stop_event = threading.Event()
+        self._capture_thread: Optional[threading.Thread] = None
+        self._alert_thread: Optional[threading.Thread] = None
+        self._writer_thread: Optional[threading.Thread] = None
 
     def _load_config(self, config_path: str) -> dict:
         """載入設定檔"""
@@ -148,103 +213,271 @@ class ElderlyFallDetectionSystem:
             self.fps_counter = 0
             self.fps_start_time = time.time()
 
-    def _draw_info_panel(self, frame: np.ndarray, detection_result) -> np.ndarray:
+    def _build_panel_bg(self) -> np.ndarray:
         """
-        繪製資訊面板
+        建立資訊面板底圖，並預先畫上固定的文字標籤
 
-        Args:
-            frame: 原始影像
-            detection_result: 偵測結果
+        Hershey 字型是以線段描邊繪製，putText 成本不低；
+        標籤文字不會變動，預先畫在底圖上即可，每幀只需繪製數值。
+        """
+        panel_bg = np.zeros((self._panel_height, self._panel_width, 3), np.uint8)
 
-        Returns:
-            繪製後的影像
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        font_scale = 0.5
+        color = (255, 255, 255)
+
+        # 座標為面板內座標（面板貼在畫面 (10, 10) 處）
+        cv2.putText(panel_bg, "FPS:", (10, 25), font, font_scale, color, 1)
+        cv2.putText(panel_bg, "Torso Angle:", (10, 50), font, font_scale, color, 1)
+        cv2.putText(panel_bg, "Head Height:", (10, 75), font, font_scale, color, 1)
+        cv2.putText(panel_bg, "Center Shift:", (10, 100), font, font_scale, color, 1)
+        cv2.putText(panel_bg, "Consecutive:", (10, 125), font, font_scale, color, 1)
+
+        return panel_bg
+
+    def _make_draw_panel(self, frame_width: int, frame_height: int):
         """
-        h, w = frame.shape[:2]
-        panel_width = 250
-        panel_height = 200
+        產生針對實際畫面尺寸特化的面板繪製函式
 
-        # 繪製半透明背景
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (10 + panel_width, 10 + panel_height),
-                     (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+        面板幾何、文字座標、顏色與 OpenCV 函式都在建立閉包時綁定完成，
+        每幀呼叫時只剩數值格式化與少量繪圖呼叫。
 
-        # 文字設定
+        Args:
+            frame_width: 實際畫面寬度
+            frame_height: 實際畫面高度
+
+        Returns:
+            draw_panel(frame, detection_result) 閉包
+        """
+        # 面板區域（若畫面比面板小則裁切）
+        panel_h = min(self._panel_height, max(frame_height - 10, 0))
+        panel_w = min(self._panel_width, max(frame_width - 10, 0))
+        panel_bg = self._panel_bg[:panel_h, :panel_w]
+        roi_rows = slice(10, 10 + panel_h)
+        roi_cols = slice(10, 10 + panel_w)
+
+        # 預先綁定的常數與函式
         font = cv2.FONT_HERSHEY_SIMPLEX
         font_scale = 0.5
-        color = (255, 255, 255)
-        y_offset = 35
-
-        # 顯示 FPS
-        cv2.putText(frame, f"FPS: {self.current_fps:.1f}", (20, y_offset),
-                   font, font_scale, color, 1)
-        y_offset += 25
-
-        # 顯示軀幹角度
-        if detection_result.torso_angle is not None:
-            angle_color = (0, 255, 0)  # 綠色
-            if detection_result.torso_angle > 50:
-                angle_color = (0, 0, 255)  # 紅色
-            elif detection_result.torso_angle > 35:
-                angle_color = (0, 165, 255)  # 橘色
-
-            cv2.putText(frame, f"Torso Angle: {detection_result.torso_angle:.1f} deg",
-                       (20, y_offset), font, font_scale, angle_color, 1)
-        else:
-            cv2.putText(frame, "Torso Angle: N/A", (20, y_offset),
-                       font, font_scale, (128, 128, 128), 1)
-        y_offset += 25
-
-        # 顯示頭部高度
-        if detection_result.head_height is not None:
-            cv2.putText(frame, f"Head Height: {detection_result.head_height:.2f}",
-                       (20, y_offset), font, font_scale, color, 1)
-        y_offset += 25
-
-        # 顯示中心位移
-        if detection_result.center_shift is not None:
-            cv2.putText(frame, f"Center Shift: {detection_result.center_shift:.1f}px",
-                       (20, y_offset), font, font_scale, color, 1)
-        y_offset += 25
-
-        # 顯示連續偵測狀態
-        consecutive = self.fall_detector.consecutive_detections
-        threshold = self.fall_detector.consecutive_frames
-        cv2.putText(frame, f"Consecutive: {consecutive}/{threshold}",
-                   (20, y_offset), font, font_scale, color, 1)
-        y_offset += 30
-
-        # 顯示警報狀態
-        if detection_result.is_fall_detected:
-            severity_text = "SEVERE" if detection_result.severity == AlertSeverity.SEVERE else "MILD"
-            alert_color = (0, 0, 255) if detection_result.severity == AlertSeverity.SEVERE else (0, 165, 255)
-
-            # 閃爍效果
-            if int(time.time() * 2) % 2 == 0:
-                cv2.putText(frame, f"ALERT: {severity_text}!", (20, y_offset),
-                           font, 0.7, alert_color, 2)
-
-                # 在畫面邊框加紅框
-                cv2.rectangle(frame, (0, 0), (w - 1, h - 1), alert_color, 5)
-
-        return frame
-
-    def _save_screenshot(self, frame: np.ndarray) -> str:
+        white = (255, 255, 255)
+        gray = (128, 128, 128)
+        green = (0, 255, 0)
+        orange = (0, 165, 255)
+        red = (0, 0, 255)
+        value_x = 150  # 數值欄起始 x 座標（標籤右側）
+        border_end = (frame_width - 1, frame_height - 1)
+        put_text = cv2.putText
+        add_weighted = cv2.addWeighted
+        fall_detector = self.fall_detector
+        threshold = fall_detector.consecutive_frames
+        system = self
+
+        def draw_panel(frame: np.ndarray, detection_result) -> np.ndarray:
+            # 繪製半透明背景：只對面板區域做 ROI 混合，
+            # 避免整張影像的 copy + addWeighted
+            roi = frame[roi_rows, roi_cols]
+            add_weighted(panel_bg, 0.7, roi, 0.3, 0, dst=roi)
+
+            # 標籤已預繪於底圖，這裡只畫會變動的數值
+            put_text(frame, f"{system.current_fps:.1f}", (70, 35),
+                     font, font_scale, white, 1)
+
+            # 顯示軀幹角度
+            torso_angle = detection_result.torso_angle
+            if torso_angle is not None:
+                angle_color = green
+                if torso_angle > 50:
+                    angle_color = red
+                elif torso_angle > 35:
+                    angle_color = orange
+
+                put_text(frame, f"{torso_angle:.1f} deg",
+                         (value_x, 60), font, font_scale, angle_color, 1)
+            else:
+                put_text(frame, "N/A", (value_x, 60),
+                         font, font_scale, gray, 1)
+
+            # 顯示頭部高度
+            if detection_result.head_height is not None:
+                put_text(frame, f"{detection_result.head_height:.2f}",
+                         (value_x, 85), font, font_scale, white, 1)
+
+            # 顯示中心位移
+            if detection_result.center_shift is not None:
+                put_text(frame, f"{detection_result.center_shift:.1f}px",
+                         (value_x, 110), font, font_scale, white, 1)
+
+            # 顯示連續偵測狀態
+            put_text(frame, f"{fall_detector.consecutive_detections}/{threshold}",
+                     (value_x, 135), font, font_scale, white, 1)
+
+            # 顯示警報狀態
+            if detection_result.is_fall_detected:
+                severe = detection_result.severity == AlertSeverity.SEVERE
+                alert_color = red if severe else orange
+
+                # 閃爍效果
+                if int(time.time() * 2) % 2 == 0:
+                    put_text(frame, f"ALERT: {'SEVERE' if severe else 'MILD'}!",
+                             (20, 165), font, 0.7, alert_color, 2)
+
+                    # 在畫面邊框加紅框
+                    cv2.rectangle(frame, (0, 0), border_end, alert_color, 5)
+
+            return frame
+
+        return draw_panel
+
+    def _screenshot_path(self) -> str:
+        """產生截圖檔案路徑（時間戳快取至秒級，strftime 偏慢）"""
+        now = int(time.time())
+        if now != self._last_ts_sec:
+            self._last_ts_str = time.strftime("%Y%m%d_%H%M%S", time.localtime(now))
+            self._last_ts_sec = now
+        filename = f"fall_alert_{self._last_ts_str}.jpg"
+        return os.path.join(self.screenshot_dir, filename)
+
+    def _save_screenshot(self, frame: np.ndarray, quality: int = 80) -> str:
         """
-        儲存截圖
+        儲存截圖（同步寫入，用於手動截圖）
 
         Args:
             frame: 影像
+            quality: JPEG 壓縮品質（警報截圖用 80 即可，編碼比預設的 95 快得多）
 
         Returns:
             截圖檔案路徑
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"fall_alert_{timestamp}.jpg"
-        filepath = os.path.join(self.screenshot_dir, filename)
-        cv2.imwrite(filepath, frame)
+        filepath = self._screenshot_path()
+        cv2.imwrite(filepath, frame,
+                    [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 0])
         return filepath
 
+    def _encode_screenshot(self, frame: np.ndarray, quality: int = 80):
+        """
+        將截圖編碼為 JPEG 位元組（記憶體內，不落地）
+
+        編碼一次後同一份位元組可同時供磁碟寫入與 LINE 上傳使用，
+        避免 imwrite 後再由上傳路徑重新讀檔。
+
+        Args:
+            frame: 影像
+            quality: JPEG 壓縮品質
+
+        Returns:
+            (檔案路徑, JPEG bytes)；編碼失敗時 bytes 為 None
+        """
+        filepath = self._screenshot_path()
+        ok, buf = cv2.imencode(
+            '.jpg', frame,
+            [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 0])
+        if not ok:
+            return filepath, None
+        return filepath, buf.tobytes()
+
+    def _writer_loop(self):
+        """寫檔執行緒：將編碼完成的截圖位元組寫入磁碟，不佔用警報流程"""
+        while True:
+            item = self._writer_q.get()
+            if item is None:  # 結束哨兵
+                break
+
+            filepath, data = item
+            try:
+                with open(filepath, 'wb') as f:
+                    f.write(data)
+            except OSError as e:
+                print(f"❌ 截圖寫入失敗：{e}")
+
+    def _calibrate_from_frame(self, frame_width: int, frame_height: int):
+        """以當前畫面的骨架資料校準基準線"""
+        landmarks = self.pose_detector.get_all_landmarks(frame_width, frame_height)
+        from pose_detection.utils import calculate_body_center, calculate_head_height_ratio
+        center = calculate_body_center(landmarks)
+        head_height = calculate_head_height_ratio(landmarks, frame_height)
+        if center and head_height:
+            self.fall_detector.calibrate(head_height, center)
+            print("✅ 校準完成")
+
+    def _setup_headless_signals(self):
+        """無頭模式下以 signal 取代鍵盤操作（僅支援 Unix）"""
+        import signal
+
+        if not hasattr(signal, 'SIGUSR1'):
+            return
+
+        def _on_calibrate(signum, frame):
+            self._calibrate_requested = True
+
+        def _on_reset(signum, frame):
+            self.fall_detector.force_reset_cooldown()
+            print("✅ 警報冷卻已重置")
+
+        signal.signal(signal.SIGUSR1, _on_calibrate)
+        signal.signal(signal.SIGUSR2, _on_reset)
+        print("ℹ️ 無頭模式：SIGUSR1 校準、SIGUSR2 重置警報冷卻")
+
+    def _capture_loop(self):
+        """擷取執行緒：持續讀取攝影機畫面並放入有界佇列（滿則阻塞形成背壓）"""
+        frame_interval = 1.0 / self.target_fps if self.target_fps > 0 else 0.0
+
+        while not self._stop_event.is_set():
+            # 先 grab 取幀（不解碼）
+            if not self.cap.grab():
+                print("❌ 無法讀取攝影機畫面")
+                break
+
+            # 若驅動緩衝區仍有堆積的舊幀，grab 掉它們避免處理過時畫面
+            # （只有最後一幀會被 retrieve 解碼，省下多餘的 JPEG/YUV 轉換）
+            if self.skip_stale_frames:
+                drain_deadline = time.time() + frame_interval * 0.5
+                while time.time() < drain_deadline:
+                    if not self.cap.grab():
+                        break
+
+            # 只解碼最新的一幀
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                print("❌ 無法讀取攝影機畫面")
+                break
+
+            try:
+                self._read_q.put(frame, timeout=1.0)
+            except queue.Full:
+                # 主執行緒處理過慢，丟棄此幀避免延遲累積
+                continue
+
+        # 通知主執行緒擷取已結束：佇列滿（主迴圈卡住）時哨兵會被丟棄，
+        # 同時設置停止事件確保主迴圈一定能跳出
+        self._stop_event.set()
+        try:
+            self._read_q.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _alert_loop(self):
+        """警報執行緒：處理截圖儲存與 LINE 通知，避免阻塞偵測主迴圈"""
+        while True:
+            item = self._alert_q.get()
+            if item is None:  # 結束哨兵
+                break
+
+            frame, detection_result = item
+            self._send_alert(detection_result, frame)
+
+    def _queue_alert(self, detection_result, frame: np.ndarray):
+        """
+        將警報工作交給警報執行緒
+
+        Args:
+            detection_result: 偵測結果
+            frame: 當前影像
+        """
+        try:
+            self._alert_q.put_nowait((frame.copy(), detection_result))
+        except queue.Full:
+            print("⚠️ 警報佇列已滿，略過此次通知")
+
     def _send_alert(self, detection_result, frame: np.ndarray):
         """
         發送警報通知
@@ -258,37 +491,53 @@ class ElderlyFallDetectionSystem:
             return
 
         try:
+            # 事件時間只取一次，各訊息共用
+            event_time = datetime.fromtimestamp(time.time())
+
             # 判斷嚴重程度
             severity = "severe" if detection_result.severity == AlertSeverity.SEVERE else "mild"
 
-            # 儲存截圖
+            # 編碼截圖（記憶體內編碼一次，磁碟寫入交給寫檔執行緒，
+            # LINE 上傳直接重複使用同一份位元組，不需等待落地或重新讀檔）
             screenshot_path = None
+            screenshot_bytes = None
             if self.config.get('notification', {}).get('include_screenshot', True):
-                screenshot_path = self._save_screenshot(frame)
-                print(f"📸 已儲存截圖：{screenshot_path}")
+                screenshot_path, screenshot_bytes = self._encode_screenshot(frame)
+                if screenshot_bytes is not None:
+                    try:
+                        self._writer_q.put_nowait((screenshot_path, screenshot_bytes))
+                        print(f"📸 已排入截圖寫入：{screenshot_path}")
+                    except queue.Full:
+                        print("⚠️ 寫檔佇列已滿，略過此次截圖存檔")
+
+            # Flex Message 與截圖同時發送（兩者走不同的 HTTPS 往返，可重疊）
+            image_future = None
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                flex_future = pool.submit(
+                    self.notifier.send_flex_message,
+                    severity=severity,
+                    angle=detection_result.torso_angle,
+                    timestamp=event_time
+                )
 
-            # 發送 Flex Message（美觀卡片）
-            success = self.notifier.send_flex_message(
-                severity=severity,
-                angle=detection_result.torso_angle,
-                timestamp=datetime.now()
-            )
+                if screenshot_bytes is not None:
+                    image_future = pool.submit(
+                        self.notifier.send_image_message, screenshot_path,
+                        image_bytes=screenshot_bytes)
 
-            if success:
+            if flex_future.result():
                 print("✅ 已發送 LINE 警報通知")
             else:
                 # 備用：發送純文字訊息
                 self.notifier.send_fall_alert(
                     severity=severity,
                     angle=detection_result.torso_angle,
-                    timestamp=datetime.now(),
+                    timestamp=event_time,
                     screenshot_path=screenshot_path
                 )
 
-            # 發送截圖到 LINE
-            if screenshot_path and os.path.exists(screenshot_path):
-                img_success = self.notifier.send_image_message(screenshot_path)
-                if img_success:
+            if image_future is not None:
+                if image_future.result():
                     print("✅ 已發送截圖到 LINE")
                 else:
                     print("⚠️ 截圖發送失敗")
@@ -315,6 +564,8 @@ class ElderlyFallDetectionSystem:
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
         self.cap.set(cv2.CAP_PROP_FPS, self.target_fps)
+        # 縮小驅動緩衝區，避免處理到數秒前的舊畫面
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
         actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -331,59 +582,136 @@ class ElderlyFallDetectionSystem:
         print()
 
         self.is_running = True
+        self._stop_event.clear()
+
+        if self.headless:
+            self._setup_headless_signals()
+
+        # 啟動擷取、警報與截圖寫檔執行緒
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop, name='capture', daemon=True)
+        self._alert_thread = threading.Thread(
+            target=self._alert_loop, name='alert', daemon=True)
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name='writer', daemon=True)
+        self._capture_thread.start()
+        self._alert_thread.start()
+        self._writer_thread.start()
+
+        # 依實際畫面尺寸特化的面板繪製閉包
+        draw_panel = self._make_draw_panel(actual_width, actual_height)
+
+        # 熱迴圈常用的屬性與方法預先綁定為區域變數（LOAD_FAST 快於 LOAD_ATTR）
+        read_frame = self._read_q.get
+        update_fps = self._update_fps
+        pose_detect = self.pose_detector.detect
+        get_landmark_array = self.pose_detector.get_landmark_array
+        fall_detect_array = self.fall_detector.detect_array
+        detect_stride = self.detect_stride
+        detect_scale = self.detect_scale
+        draw_stride = self.draw_skeleton_stride
+        headless = self.headless
+        # OpenCV 4.2 以前沒有 pollKey，退回 waitKey(1)
+        poll_key = getattr(cv2, 'pollKey', None) or (lambda: cv2.waitKey(1))
 
         while self.is_running:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("❌ 無法讀取攝影機畫面")
+            try:
+                frame = read_frame(timeout=1.0)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    break
+                continue
+
+            if frame is None:  # 擷取執行緒已結束
                 break
 
             # 更新 FPS
-            self._update_fps()
+            update_fps()
 
             h, w = frame.shape[:2]
+            self._frame_idx += 1
+
+            # 依照 detect_every_n 間隔執行姿勢偵測，
+            # 其餘幀沿用前次結果（跌倒事件持續數百毫秒，降頻不影響召回率）
+            run_detection = (self._frame_idx % detect_stride == 0
+                             or self._last_detection_result is None)
+
+            if run_detection:
+                # 進行姿勢偵測（縮小輸入；關鍵點為正規化座標，仍以原尺寸換算像素）
+                if 0 < detect_scale < 1.0:
+                    detect_frame = cv2.resize(frame, None,
+                                              fx=detect_scale, fy=detect_scale,
+                                              interpolation=cv2.INTER_AREA)
+                else:
+                    detect_frame = frame
 
-            # 進行姿勢偵測
-            detected = self.pose_detector.detect(frame)
-
-            # 繪製骨架
-            if detected:
-                frame = self.pose_detector.draw_skeleton(frame)
-
-                # 取得關鍵點座標
-                landmarks = self.pose_detector.get_all_landmarks(w, h)
+                if (self._rgb_buf is None
+                        or self._rgb_buf.shape != detect_frame.shape):
+                    self._rgb_buf = np.empty_like(detect_frame)
 
-                # 進行跌倒偵測
-                detection_result = self.fall_detector.detect(landmarks, h)
+                detected = pose_detect(detect_frame, rgb_out=self._rgb_buf)
 
-                # 如果偵測到跌倒，發送警報
-                if detection_result.is_fall_detected:
-                    print(f"⚠️ 偵測到可能跌倒！嚴重程度：{detection_result.severity.name}")
-                    for reason in detection_result.trigger_reasons:
-                        print(f"   - {reason}")
-                    self._send_alert(detection_result, frame)
+                if detected:
+                    # 取得關鍵點座標（(33, 3) 陣列，免去逐點建 dict 的開銷）
+                    landmark_array = get_landmark_array(w, h)
+
+                    # 進行跌倒偵測
+                    detection_result = fall_detect_array(landmark_array, h)
+
+                    # 如果偵測到跌倒，發送警報
+                    # （單次 logger 呼叫、由背景 QueueListener 輸出，不佔用偵測迴圈）
+                    if detection_result.is_fall_detected:
+                        logger.warning(
+                            "⚠️ 偵測到可能跌倒！嚴重程度：%s（%s）",
+                            detection_result.severity.name,
+                            " | ".join(detection_result.trigger_reasons))
+                        self._queue_alert(detection_result, frame)
+                else:
+                    # 未偵測到人體時的預設結果
+                    from pose_detection.fall_detector import DetectionResult
+                    detection_result = DetectionResult(
+                        is_fall_detected=False,
+                        severity=AlertSeverity.NONE,
+                        torso_angle=None,
+                        head_height=None,
+                        center_shift=None,
+                        trigger_reasons=[],
+                        timestamp=time.monotonic(),  # 與 FallDetector 的時基一致
+                        confidence=0.0
+                    )
+
+                self._last_detected = detected
+                self._last_detection_result = detection_result
             else:
-                # 未偵測到人體時的預設結果
-                from pose_detection.fall_detector import DetectionResult
-                detection_result = DetectionResult(
-                    is_fall_detected=False,
-                    severity=AlertSeverity.NONE,
-                    torso_angle=None,
-                    head_height=None,
-                    center_shift=None,
-                    trigger_reasons=[],
-                    timestamp=time.time(),
-                    confidence=0.0
-                )
+                detected = self._last_detected
+                detection_result = self._last_detection_result
+
+            # 繪製骨架（沿用前次偵測的關鍵點亦可正確繪製）
+            # 無頭模式下完全跳過，純粹是 overlay 成本
+            if (detected and not headless
+                    and self._frame_idx % draw_stride == 0):
+                # 警報截圖已在偵測時另行複製，顯示幀可直接就地繪製
+                frame = self.pose_detector.draw_skeleton(frame, inplace=True)
+
+            # 無頭模式：不繪製面板、不顯示視窗（省下整個 overlay 的記憶體頻寬）
+            if headless:
+                if self._calibrate_requested:
+                    self._calibrate_requested = False
+                    if detected:
+                        self._calibrate_from_frame(w, h)
+                continue
 
             # 繪製資訊面板
-            frame = self._draw_info_panel(frame, detection_result)
+            frame = draw_panel(frame, detection_result)
 
             # 顯示畫面
             cv2.imshow('Elderly Fall Detection System', frame)
 
-            # 處理按鍵
-            key = cv2.waitKey(1) & 0xFF
+            # 處理按鍵（pollKey 立即返回，不像 waitKey(1) 至少睡 1 ms）
+            key = poll_key() & 0xFF
+
+            if key == 0xFF:  # 無按鍵事件（pollKey 回傳 -1）
+                continue
 
             if key == ord('q') or key == 27:  # q 或 ESC
                 print("\n正在關閉系統...")
@@ -391,13 +719,7 @@ class ElderlyFallDetectionSystem:
 
             elif key == ord('c'):  # 校準
                 if detected:
-                    landmarks = self.pose_detector.get_all_landmarks(w, h)
-                    from pose_detection.utils import calculate_body_center, calculate_head_height_ratio
-                    center = calculate_body_center(landmarks)
-                    head_height = calculate_head_height_ratio(landmarks, h)
-                    if center and head_height:
-                        self.fall_detector.calibrate(head_height, center)
-                        print("✅ 校準完成")
+                    self._calibrate_from_frame(w, h)
 
             elif key == ord('r'):  # 重置冷卻
                 self.fall_detector.force_reset_cooldown()
@@ -412,10 +734,32 @@ class ElderlyFallDetectionSystem:
     def stop(self):
         """停止系統"""
         self.is_running = False
+        self._stop_event.set()
+
+        # 等待管線執行緒收尾
+        if self._capture_thread and self._capture_thread.is_alive():
+            self._capture_thread.join(timeout=2.0)
+
+        if self._alert_thread and self._alert_thread.is_alive():
+            try:
+                self._alert_q.put_nowait(None)
+            except queue.Full:
+                pass
+            self._alert_thread.join(timeout=5.0)
+
+        if self._writer_thread and self._writer_thread.is_alive():
+            try:
+                self._writer_q.put_nowait(None)
+            except queue.Full:
+                pass
+            self._writer_thread.join(timeout=5.0)
 
         if self.pose_detector:
             self.pose_detector.release()
 
+        if self.notifier:
+            self.notifier.close()
+
         if self.cap:
             self.cap.release()
 
@@ -423,6 +767,27 @@ class ElderlyFallDetectionSystem:
         print("✅ 系統已關閉")
 
 
+def _setup_logging() -> logging.handlers.QueueListener:
+    """
+    設定佇列式日誌：格式化與輸出由背景 QueueListener 處理，
+    呼叫端只需把紀錄放入佇列，不會被 stdio 鎖或編碼轉換拖慢
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    return listener
+
+
 def main():
     """主程式進入點"""
     import argparse
@@ -437,6 +802,8 @@ def main():
 
     args = parser.parse_args()
 
+    log_listener = _setup_logging()
+
     # 建立系統實例
     system = ElderlyFallDetectionSystem(config_path=args.config)
 
@@ -450,6 +817,8 @@ def main():
     except KeyboardInterrupt:
         print("\n收到中斷訊號，正在關閉系統...")
         system.stop()
+    finally:
+        log_listener.stop()
 
 
 if __name__ == '__main__':
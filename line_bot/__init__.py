@@ -1,3 +1,4 @@
 from .bot import LineBotNotifier, create_notifier_from_config
+from .async_bot import AsyncLineBotNotifier
 
-__all__ = ['LineBotNotifier', 'create_notifier_from_config']
+__all__ = ['LineBotNotifier', 'AsyncLineBotNotifier', 'create_notifier_from_config']
@@ -0,0 +1,217 @@
+"""
+LINE Bot 非同步通知模組 - aiohttp 版本
+跌倒事件的多則訊息以 asyncio.gather 同時發送，
+整體延遲從各往返時間的總和降為其中最大值
+"""
+
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:  # aiohttp 為選用依賴，未安裝時退回同步的 LineBotNotifier
+    HAS_AIOHTTP = False
+
+import asyncio
+
+# 修正 Windows 控制台編碼問題
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+
+class AsyncLineBotNotifier:
+    """
+    LINE Bot 非同步通知發送器
+
+    與 LineBotNotifier 介面對應，但各發送方法為 async，
+    可在單一事件迴圈中併發多個 HTTPS 請求（共用連線池與 DNS 快取）。
+
+    使用方式：
+        notifier = AsyncLineBotNotifier(token, secret, user_id)
+        await notifier.send_fall_event(severity="severe", angle=55.0)
+        ...
+        await notifier.close()
+    """
+
+    # LINE Messaging API 端點
+    PUSH_MESSAGE_URL = "https://api.line.me/v2/bot/message/push"
+
+    def __init__(self,
+                 channel_access_token: str,
+                 channel_secret: str,
+                 user_id: Optional[str] = None):
+        """
+        初始化非同步 LINE Bot 通知器
+
+        Args:
+            channel_access_token: LINE Bot Channel Access Token
+            channel_secret: LINE Bot Channel Secret
+            user_id: 目標用戶 ID（用於 Push Message）
+        """
+        if not HAS_AIOHTTP:
+            raise ImportError(
+                "AsyncLineBotNotifier 需要 aiohttp，請先 pip install aiohttp，"
+                "或改用同步的 LineBotNotifier")
+
+        self.channel_access_token = channel_access_token
+        self.channel_secret = channel_secret
+        self.user_id = user_id
+
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.channel_access_token}"
+        }
+
+        # 延遲建立 session：aiohttp.ClientSession 必須在事件迴圈中建立
+        self._session: Optional['aiohttp.ClientSession'] = None
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        """取得（或延遲建立）共用的 aiohttp session"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=8, ttl_dns_cache=300)
+            )
+        return self._session
+
+    async def _push(self, messages: list, user_id: Optional[str] = None) -> bool:
+        """
+        發送 Push Message（共用的 POST 實作）
+
+        Args:
+            messages: LINE message 物件列表
+            user_id: 目標用戶 ID（若未提供則使用初始化時的 user_id）
+
+        Returns:
+            是否發送成功
+        """
+        target_user = user_id or self.user_id
+        if not target_user:
+            print("錯誤：未提供目標用戶 ID")
+            return False
+
+        payload = {"to": target_user, "messages": messages}
+
+        try:
+            session = self._get_session()
+            async with session.post(
+                    self.PUSH_MESSAGE_URL,
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    return True
+                body = await response.text()
+                print(f"❌ 訊息發送失敗: {response.status}")
+                print(f"錯誤訊息: {body}")
+                return False
+
+        except asyncio.TimeoutError:
+            print("❌ 發送訊息逾時")
+            return False
+        except Exception as e:
+            print(f"❌ 發送訊息時發生錯誤: {e}")
+            return False
+
+    async def send_text_message(self,
+                                text: str,
+                                user_id: Optional[str] = None) -> bool:
+        """
+        發送文字訊息
+
+        Args:
+            text: 訊息內容
+            user_id: 目標用戶 ID
+
+        Returns:
+            是否發送成功
+        """
+        return await self._push([{"type": "text", "text": text}], user_id)
+
+    async def send_flex_message(self,
+                                severity: str,
+                                angle: Optional[float] = None,
+                                timestamp: Optional[datetime] = None,
+                                user_id: Optional[str] = None) -> bool:
+        """
+        發送 Flex Message 格式的跌倒警示
+
+        內容與同步版 LineBotNotifier.send_flex_message 相同，
+        透過同步模組的 payload 建構邏輯產生訊息後以 aiohttp 發送。
+
+        Args:
+            severity: 危險程度（"mild" 或 "severe"）
+            angle: 軀幹傾斜角度
+            timestamp: 事件時間戳
+            user_id: 目標用戶 ID
+
+        Returns:
+            是否發送成功
+        """
+        from .bot import LineBotNotifier
+
+        flex_content = LineBotNotifier.build_flex_content(
+            severity=severity, angle=angle, timestamp=timestamp)
+
+        message = {
+            "type": "flex",
+            "altText": "跌倒偵測警報 - 偵測到可能跌倒！",
+            "contents": flex_content
+        }
+        return await self._push([message], user_id)
+
+    async def send_image_message(self,
+                                 image_url: str,
+                                 user_id: Optional[str] = None) -> bool:
+        """
+        發送圖片訊息（需已是 HTTPS URL；上傳第三方圖床請使用同步通知器）
+
+        Args:
+            image_url: 圖片的 HTTPS URL
+            user_id: 目標用戶 ID
+
+        Returns:
+            是否發送成功
+        """
+        message = {
+            "type": "image",
+            "originalContentUrl": image_url,
+            "previewImageUrl": image_url
+        }
+        return await self._push([message], user_id)
+
+    async def send_fall_event(self,
+                              severity: str,
+                              angle: Optional[float] = None,
+                              timestamp: Optional[datetime] = None,
+                              image_url: Optional[str] = None,
+                              user_id: Optional[str] = None) -> bool:
+        """
+        發送完整跌倒事件（Flex 卡片 + 截圖）— 各訊息併發送出
+
+        Args:
+            severity: 危險程度
+            angle: 軀幹傾斜角度
+            timestamp: 事件時間戳
+            image_url: 截圖的 HTTPS URL（可省略）
+            user_id: 目標用戶 ID
+
+        Returns:
+            所有訊息是否皆發送成功
+        """
+        tasks = [self.send_flex_message(severity, angle, timestamp, user_id)]
+        if image_url:
+            tasks.append(self.send_image_message(image_url, user_id))
+
+        results = await asyncio.gather(*tasks)
+        return all(results)
+
+    async def close(self):
+        """關閉連線池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -3,15 +3,50 @@ LINE Bot 通知模組 - Python 版本
 提供 LINE Bot Push Message 功能
 """
 
+from __future__ import annotations
+
 import os
 import sys
+import copy
 import json
-import base64
+import time
+import random
+import hashlib
+import functools
+import importlib
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
-import requests
+from concurrent.futures import Future, ThreadPoolExecutor
 import threading
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # orjson 為選用的加速依賴
+    HAS_ORJSON = False
+
+# requests 延遲載入：只讀取設定或匯入本模組的程式不必付匯入成本
+requests = None
+
+
+if HAS_ORJSON:
+    def _dumps(obj) -> bytes:
+        """序列化為 JSON bytes（orjson 比標準庫快約 5 倍）"""
+        return orjson.dumps(obj)
+else:
+    def _dumps(obj) -> bytes:
+        """序列化為 JSON bytes（標準庫實作，介面與 orjson 版相同）"""
+        return json.dumps(obj, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+
+def _load_requests():
+    """實際建構通知器時才載入 requests"""
+    global requests
+    if requests is None:
+        requests = importlib.import_module('requests')
+
 # 修正 Windows 控制台編碼問題
 if sys.platform == 'win32':
     try:
@@ -20,6 +55,139 @@ if sys.platform == 'win32':
         pass
 
 
+# Flex Message 靜態骨架：每次警報只 deepcopy 後補上動態欄位
+# （時間、嚴重程度、標題顏色、選用的角度列），
+# 不必逐次重建整棵數十個 dict/list 的巢狀結構
+_FLEX_TEMPLATE = {
+    "type": "bubble",
+    "header": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {
+                "type": "text",
+                "text": "🚨 跌倒偵測警報",
+                "color": "#FFFFFF",
+                "weight": "bold",
+                "size": "lg"
+            }
+        ],
+        "backgroundColor": "#DC3545",  # 依嚴重程度覆寫
+        "paddingAll": "15px"
+    },
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {
+                "type": "text",
+                "text": "偵測到可能跌倒！",
+                "weight": "bold",
+                "size": "xl",
+                "margin": "md"
+            },
+            {
+                "type": "text",
+                "text": "請立即查看長者狀況",
+                "size": "sm",
+                "color": "#666666",
+                "margin": "md"
+            },
+            {
+                "type": "separator",
+                "margin": "lg"
+            },
+            {
+                "type": "box",
+                "layout": "vertical",
+                "margin": "lg",
+                "spacing": "sm",
+                "contents": [
+                    {
+                        "type": "box",
+                        "layout": "horizontal",
+                        "contents": [
+                            {
+                                "type": "text",
+                                "text": "時間",
+                                "color": "#666666",
+                                "size": "sm",
+                                "flex": 1
+                            },
+                            {
+                                "type": "text",
+                                "text": "",  # 填入事件時間
+                                "size": "sm",
+                                "color": "#333333",
+                                "flex": 2
+                            }
+                        ]
+                    },
+                    {
+                        "type": "box",
+                        "layout": "horizontal",
+                        "contents": [
+                            {
+                                "type": "text",
+                                "text": "嚴重程度",
+                                "color": "#666666",
+                                "size": "sm",
+                                "flex": 1
+                            },
+                            {
+                                "type": "text",
+                                "text": "",  # 填入嚴重程度文字
+                                "size": "sm",
+                                "color": "#333333",  # 依嚴重程度覆寫
+                                "weight": "bold",
+                                "flex": 2
+                            }
+                        ]
+                    }
+                ]
+            }
+        ]
+    },
+    "footer": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {
+                "type": "text",
+                "text": "請盡快確認安全狀況！",
+                "color": "#DC3545",
+                "size": "sm",
+                "align": "center",
+                "weight": "bold"
+            }
+        ],
+        "paddingAll": "10px"
+    }
+}
+
+# 選用的「傾斜角度」資訊列
+_FLEX_ANGLE_BOX_TEMPLATE = {
+    "type": "box",
+    "layout": "horizontal",
+    "contents": [
+        {
+            "type": "text",
+            "text": "傾斜角度",
+            "color": "#666666",
+            "size": "sm",
+            "flex": 1
+        },
+        {
+            "type": "text",
+            "text": "",  # 填入角度數值
+            "size": "sm",
+            "color": "#333333",
+            "flex": 2
+        }
+    ]
+}
+
+
 class LineBotNotifier:
     """
     LINE Bot 通知發送器
@@ -30,6 +198,31 @@ class LineBotNotifier:
     PUSH_MESSAGE_URL = "https://api.line.me/v2/bot/message/push"
     BROADCAST_URL = "https://api.line.me/v2/bot/message/broadcast"
 
+    # 重試參數：只對暫時性失敗重試（限流與伺服器端錯誤），
+    # 其餘 4xx 屬請求本身的問題，重試也不會成功
+    _RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+    _RETRY_MAX = 3
+    _RETRY_BASE_SECONDS = 1.0
+    _RETRY_CAP_SECONDS = 30.0
+
+    # 逾時採（連線, 讀取）分離設定：握手卡住時 2 秒即失敗，
+    # 快速交還給重試迴圈，而不是整條警報路徑停滯 10 秒
+    _LINE_TIMEOUT = (2.0, 5.0)
+    _IMGBB_TIMEOUT = (2.0, 10.0)  # 上傳內容較大，讀取給寬一點
+
+    # 背景發送中警報數上限（跌倒持續期間可能連續觸發，避免無界堆積）
+    _MAX_PENDING_ALERTS = 4
+
+    # 重複警報抑制：同一（用戶, 嚴重程度, 秒）在視窗內只發一次，
+    # 避免重試或連續觸發讓照護者收到重複通知
+    _DEDUPE_WINDOW_SECONDS = 30.0
+    _DEDUPE_PURGE_SECONDS = 60.0
+    _DEDUPE_MAX_ENTRIES = 64
+
+    # imgbb 上傳快取：TTL 低於 expiration=600，留餘裕避免回傳將過期的 URL
+    _IMG_CACHE_TTL_SECONDS = 500.0
+    _IMG_CACHE_MAX_ENTRIES = 16
+
     def __init__(self,
                  channel_access_token: str,
                  channel_secret: str,
@@ -42,6 +235,8 @@ class LineBotNotifier:
             channel_secret: LINE Bot Channel Secret
             user_id: 目標用戶 ID（用於 Push Message）
         """
+        _load_requests()
+
         self.channel_access_token = channel_access_token
         self.channel_secret = channel_secret
         self.user_id = user_id
@@ -51,57 +246,190 @@ class LineBotNotifier:
             "Authorization": f"Bearer {self.channel_access_token}"
         }
 
-    def send_text_message(self,
-                          text: str,
-                          user_id: Optional[str] = None) -> bool:
+        # 共用連線池：重複使用 TLS 連線，省下每次發送的握手延遲
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4, pool_maxsize=8, max_retries=0)
+        self._session.mount('https://', adapter)
+
+        # imgbb 走獨立 session：同樣保留連線池，
+        # 但不帶 LINE 的 Authorization 標頭（權杖不應送往第三方服務）
+        self._imgbb_session = requests.Session()
+        self._imgbb_session.mount(
+            'https://',
+            requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=2, max_retries=0))
+
+        # 背景發送工作池：偵測迴圈交付後立即返回，
+        # 網路 I/O 期間 requests 會釋放 GIL，不影響影像管線
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix='line-bot')
+        self._pending: set = set()
+
+        # 最近發送的警報鍵與時間（供重複抑制；背景執行緒共用需加鎖）
+        self._recent_events: OrderedDict = OrderedDict()
+        self._dedupe_lock = threading.Lock()
+
+        # 同一截圖重複上傳 imgbb 時直接重用先前取得的 URL
+        self._img_cache: OrderedDict = OrderedDict()
+        self._img_cache_lock = threading.Lock()
+
+    def close(self):
+        """關閉背景工作池與連線池（系統停止時呼叫，等待發送中的警報完成）"""
+        self._executor.shutdown(wait=True)
+        self._session.close()
+        self._imgbb_session.close()
+
+    @staticmethod
+    def _event_key(target_user: str, severity: str, event_time: datetime) -> str:
+        """計算警報事件的去重鍵（用戶 + 嚴重程度 + 秒級時間戳）"""
+        raw = f"{target_user}|{severity}|{int(event_time.timestamp())}"
+        return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+    def _is_duplicate_alert(self, event_key: str) -> bool:
+        """檢查事件鍵是否在抑制視窗內已發送過（順帶清除過期項目）"""
+        now = time.time()
+        with self._dedupe_lock:
+            while self._recent_events:
+                oldest_key = next(iter(self._recent_events))
+                if now - self._recent_events[oldest_key] > self._DEDUPE_PURGE_SECONDS:
+                    self._recent_events.popitem(last=False)
+                else:
+                    break
+
+            sent_at = self._recent_events.get(event_key)
+            return (sent_at is not None
+                    and now - sent_at < self._DEDUPE_WINDOW_SECONDS)
+
+    def _record_alert(self, event_key: str):
+        """記錄已成功發送的事件鍵（只在發送成功後呼叫，失敗仍可重送）"""
+        with self._dedupe_lock:
+            self._recent_events[event_key] = time.time()
+            while len(self._recent_events) > self._DEDUPE_MAX_ENTRIES:
+                self._recent_events.popitem(last=False)
+
+    def send_fall_alert_async(self, *args, **kwargs) -> Optional[Future]:
         """
-        發送文字訊息
+        在背景執行緒發送跌倒警示，立即返回
+
+        參數與 send_fall_alert 相同。發送中的警報數達上限時
+        直接略過（長時間跌倒會連續觸發，不應無界排隊）。
+
+        Returns:
+            發送工作的 Future；因佇列已滿被略過時返回 None
+        """
+        if len(self._pending) >= self._MAX_PENDING_ALERTS:
+            print("⚠️ 背景警報佇列已滿，略過此次發送")
+            return None
+
+        future = self._executor.submit(self.send_fall_alert, *args, **kwargs)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def _post_with_retry(self, session: requests.Session, url: str, **kwargs):
+        """
+        帶重試的 POST：指數退避加全幅抖動（full jitter）
+
+        暫時性失敗（429 / 5xx / 連線錯誤 / 逾時）最多重試 _RETRY_MAX 次，
+        等待時間為 min(cap, base * 2^attempt) 內的隨機值，
+        抖動可避免多個來源在服務恢復時同時重送。
 
         Args:
-            text: 訊息內容
-            user_id: 目標用戶 ID（若未提供則使用初始化時的 user_id）
+            session: 使用的連線 session
+            url: 目標 URL
+            **kwargs: 轉交給 session.post 的參數
 
         Returns:
-            是否發送成功
+            requests.Response；連線層重試耗盡時拋出最後一次的例外
         """
-        target_user = user_id or self.user_id
-        if not target_user:
-            print("錯誤：未提供目標用戶 ID")
-            return False
+        response = None
+        for attempt in range(self._RETRY_MAX + 1):
+            try:
+                response = session.post(url, **kwargs)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                if attempt == self._RETRY_MAX:
+                    raise
+            else:
+                if (response.status_code not in self._RETRY_STATUS
+                        or attempt == self._RETRY_MAX):
+                    return response
 
-        payload = {
-            "to": target_user,
-            "messages": [
-                {
-                    "type": "text",
-                    "text": text
-                }
-            ]
-        }
+            delay = min(self._RETRY_CAP_SECONDS,
+                        self._RETRY_BASE_SECONDS * (2 ** attempt))
+            time.sleep(random.uniform(0, delay))
+
+        return response
+
+    def _do_post(self, url: str, payload: dict, label: str) -> bool:
+        """
+        共用的 JSON POST 路徑：序列化、重試、狀態檢查與日誌集中在一處，
+        連線池 / 退避 / 逾時等熱路徑改善自動套用到所有訊息類型
 
+        Args:
+            url: 目標端點
+            payload: 要序列化的請求內容
+            label: 日誌中顯示的訊息類型名稱
+
+        Returns:
+            是否發送成功
+        """
         try:
-            response = requests.post(
-                self.PUSH_MESSAGE_URL,
-                headers=self.headers,
-                json=payload,
-                timeout=10
+            response = self._post_with_retry(
+                self._session,
+                url,
+                data=_dumps(payload),  # 預先序列化，繞過 requests 內部的 json.dumps
+                timeout=self._LINE_TIMEOUT
             )
 
             if response.status_code == 200:
-                print(f"✅ 訊息發送成功")
+                print(f"✅ {label}發送成功")
                 return True
-            else:
-                print(f"❌ 訊息發送失敗: {response.status_code}")
-                print(f"錯誤訊息: {response.text}")
-                return False
+
+            print(f"❌ {label}發送失敗: {response.status_code}")
+            print(f"錯誤訊息: {response.text}")
+            return False
 
         except requests.exceptions.Timeout:
-            print(f"❌ 發送訊息逾時")
+            print(f"❌ 發送{label}逾時")
             return False
         except Exception as e:
-            print(f"❌ 發送訊息時發生錯誤: {e}")
+            print(f"❌ 發送{label}時發生錯誤: {e}")
             return False
 
+    def _do_push(self,
+                 target_user: str,
+                 messages: list,
+                 label: str = "訊息") -> bool:
+        """發送 Push Message（各 send_* 方法只負責組 messages 列表）"""
+        return self._do_post(
+            self.PUSH_MESSAGE_URL,
+            {"to": target_user, "messages": messages},
+            label
+        )
+
+    def send_text_message(self,
+                          text: str,
+                          user_id: Optional[str] = None) -> bool:
+        """
+        發送文字訊息
+
+        Args:
+            text: 訊息內容
+            user_id: 目標用戶 ID（若未提供則使用初始化時的 user_id）
+
+        Returns:
+            是否發送成功
+        """
+        target_user = user_id or self.user_id
+        if not target_user:
+            print("錯誤：未提供目標用戶 ID")
+            return False
+
+        return self._do_push(target_user, [{"type": "text", "text": text}])
+
     def send_fall_alert(self,
                         severity: str,
                         angle: Optional[float] = None,
@@ -130,6 +458,12 @@ class LineBotNotifier:
         event_time = timestamp or datetime.now()
         time_str = event_time.strftime("%Y-%m-%d %H:%M:%S")
 
+        # 重複警報抑制：視窗內的同一事件不再發送（視為已送達）
+        event_key = self._event_key(target_user, severity, event_time)
+        if self._is_duplicate_alert(event_key):
+            print("ℹ️ 相同警報已於抑制視窗內發送，略過")
+            return True
+
         # 根據嚴重程度設定訊息
         if severity == "severe":
             severity_text = "🚨 嚴重"
@@ -166,33 +500,10 @@ class LineBotNotifier:
             # 這裡提供一個替代方案：將圖片編碼為 base64 並提示用戶
             pass
 
-        payload = {
-            "to": target_user,
-            "messages": messages
-        }
-
-        try:
-            response = requests.post(
-                self.PUSH_MESSAGE_URL,
-                headers=self.headers,
-                json=payload,
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                print(f"✅ 跌倒警示發送成功")
-                return True
-            else:
-                print(f"❌ 跌倒警示發送失敗: {response.status_code}")
-                print(f"錯誤訊息: {response.text}")
-                return False
-
-        except requests.exceptions.Timeout:
-            print(f"❌ 發送警示逾時")
-            return False
-        except Exception as e:
-            print(f"❌ 發送警示時發生錯誤: {e}")
-            return False
+        if self._do_push(target_user, messages, "跌倒警示"):
+            self._record_alert(event_key)
+            return True
+        return False
 
     def send_flex_message(self,
                           severity: str,
@@ -217,6 +528,47 @@ class LineBotNotifier:
             return False
 
         event_time = timestamp or datetime.now()
+
+        # 重複警報抑制：視窗內的同一事件不再發送（視為已送達）
+        event_key = self._event_key(target_user, severity, event_time)
+        if self._is_duplicate_alert(event_key):
+            print("ℹ️ 相同警報已於抑制視窗內發送，略過")
+            return True
+
+        flex_content = self.build_flex_content(
+            severity=severity, angle=angle, timestamp=event_time)
+
+        messages = [
+            {
+                "type": "flex",
+                "altText": "跌倒偵測警報 - 偵測到可能跌倒！",
+                "contents": flex_content
+            }
+        ]
+
+        if self._do_push(target_user, messages, "Flex Message"):
+            self._record_alert(event_key)
+            return True
+        return False
+
+    @staticmethod
+    def build_flex_content(severity: str,
+                           angle: Optional[float] = None,
+                           timestamp: Optional[datetime] = None) -> dict:
+        """
+        建構跌倒警示的 Flex Message 內容（bubble 物件）
+
+        與發送邏輯分離，讓同步與非同步通知器共用同一份卡片版面。
+
+        Args:
+            severity: 危險程度（"mild" 或 "severe"）
+            angle: 軀幹傾斜角度
+            timestamp: 事件時間戳
+
+        Returns:
+            Flex Message 的 contents 字典
+        """
+        event_time = timestamp or datetime.now()
         time_str = event_time.strftime("%Y-%m-%d %H:%M:%S")
 
         # 根據嚴重程度設定顏色
@@ -227,171 +579,23 @@ class LineBotNotifier:
             header_color = "#FFC107"
             severity_text = "輕微警告"
 
-        # Flex Message 內容
-        flex_content = {
-            "type": "bubble",
-            "header": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {
-                        "type": "text",
-                        "text": "🚨 跌倒偵測警報",
-                        "color": "#FFFFFF",
-                        "weight": "bold",
-                        "size": "lg"
-                    }
-                ],
-                "backgroundColor": header_color,
-                "paddingAll": "15px"
-            },
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {
-                        "type": "text",
-                        "text": "偵測到可能跌倒！",
-                        "weight": "bold",
-                        "size": "xl",
-                        "margin": "md"
-                    },
-                    {
-                        "type": "text",
-                        "text": "請立即查看長者狀況",
-                        "size": "sm",
-                        "color": "#666666",
-                        "margin": "md"
-                    },
-                    {
-                        "type": "separator",
-                        "margin": "lg"
-                    },
-                    {
-                        "type": "box",
-                        "layout": "vertical",
-                        "margin": "lg",
-                        "spacing": "sm",
-                        "contents": [
-                            {
-                                "type": "box",
-                                "layout": "horizontal",
-                                "contents": [
-                                    {
-                                        "type": "text",
-                                        "text": "時間",
-                                        "color": "#666666",
-                                        "size": "sm",
-                                        "flex": 1
-                                    },
-                                    {
-                                        "type": "text",
-                                        "text": time_str,
-                                        "size": "sm",
-                                        "color": "#333333",
-                                        "flex": 2
-                                    }
-                                ]
-                            },
-                            {
-                                "type": "box",
-                                "layout": "horizontal",
-                                "contents": [
-                                    {
-                                        "type": "text",
-                                        "text": "嚴重程度",
-                                        "color": "#666666",
-                                        "size": "sm",
-                                        "flex": 1
-                                    },
-                                    {
-                                        "type": "text",
-                                        "text": severity_text,
-                                        "size": "sm",
-                                        "color": header_color,
-                                        "weight": "bold",
-                                        "flex": 2
-                                    }
-                                ]
-                            }
-                        ]
-                    }
-                ]
-            },
-            "footer": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {
-                        "type": "text",
-                        "text": "請盡快確認安全狀況！",
-                        "color": "#DC3545",
-                        "size": "sm",
-                        "align": "center",
-                        "weight": "bold"
-                    }
-                ],
-                "paddingAll": "10px"
-            }
-        }
+        # 由模組層級的靜態骨架複製，只補上會變動的欄位
+        flex_content = copy.deepcopy(_FLEX_TEMPLATE)
+        flex_content["header"]["backgroundColor"] = header_color
+
+        info_rows = flex_content["body"]["contents"][3]["contents"]
+        info_rows[0]["contents"][1]["text"] = time_str
+        severity_cell = info_rows[1]["contents"][1]
+        severity_cell["text"] = severity_text
+        severity_cell["color"] = header_color
 
         # 如果有角度資訊，添加到內容中
         if angle is not None:
-            angle_box = {
-                "type": "box",
-                "layout": "horizontal",
-                "contents": [
-                    {
-                        "type": "text",
-                        "text": "傾斜角度",
-                        "color": "#666666",
-                        "size": "sm",
-                        "flex": 1
-                    },
-                    {
-                        "type": "text",
-                        "text": f"{angle:.1f}°",
-                        "size": "sm",
-                        "color": "#333333",
-                        "flex": 2
-                    }
-                ]
-            }
-            flex_content["body"]["contents"][3]["contents"].append(angle_box)
-
-        payload = {
-            "to": target_user,
-            "messages": [
-                {
-                    "type": "flex",
-                    "altText": "跌倒偵測警報 - 偵測到可能跌倒！",
-                    "contents": flex_content
-                }
-            ]
-        }
+            angle_box = copy.deepcopy(_FLEX_ANGLE_BOX_TEMPLATE)
+            angle_box["contents"][1]["text"] = f"{angle:.1f}°"
+            info_rows.append(angle_box)
 
-        try:
-            response = requests.post(
-                self.PUSH_MESSAGE_URL,
-                headers=self.headers,
-                json=payload,
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                print(f"✅ Flex Message 發送成功")
-                return True
-            else:
-                print(f"❌ Flex Message 發送失敗: {response.status_code}")
-                print(f"錯誤訊息: {response.text}")
-                return False
-
-        except requests.exceptions.Timeout:
-            print(f"❌ 發送 Flex Message 逾時")
-            return False
-        except Exception as e:
-            print(f"❌ 發送 Flex Message 時發生錯誤: {e}")
-            return False
+        return flex_content
 
     def broadcast_message(self, text: str) -> bool:
         """
@@ -403,44 +607,23 @@ class LineBotNotifier:
         Returns:
             是否發送成功
         """
-        payload = {
-            "messages": [
-                {
-                    "type": "text",
-                    "text": text
-                }
-            ]
-        }
-
-        try:
-            response = requests.post(
-                self.BROADCAST_URL,
-                headers=self.headers,
-                json=payload,
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                print(f"✅ 廣播訊息發送成功")
-                return True
-            else:
-                print(f"❌ 廣播訊息發送失敗: {response.status_code}")
-                return False
-
-        except requests.exceptions.Timeout:
-            print(f"❌ 廣播訊息逾時")
-            return False
-        except Exception as e:
-            print(f"❌ 廣播訊息時發生錯誤: {e}")
-            return False
+        return self._do_post(
+            self.BROADCAST_URL,
+            {"messages": [{"type": "text", "text": text}]},
+            "廣播訊息"
+        )
 
-    def _upload_image_to_imgbb(self, image_path: str, api_key: str = None) -> Optional[str]:
+    def _upload_image_to_imgbb(self,
+                               image_path: str,
+                               api_key: str = None,
+                               image_bytes: Optional[bytes] = None) -> Optional[str]:
         """
         上傳圖片到 imgbb.com 並取得 URL
 
         Args:
             image_path: 本地圖片路徑
             api_key: imgbb API 金鑰（可從環境變數 IMGBB_API_KEY 讀取）
+            image_bytes: 已在記憶體中的圖片位元組；提供時直接使用，不讀取檔案
 
         Returns:
             圖片的 HTTPS URL，失敗則返回 None
@@ -453,24 +636,50 @@ class LineBotNotifier:
             print("⚠️ 未設定 IMGBB_API_KEY，無法上傳圖片")
             return None
 
-        try:
-            with open(image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
+        # 快取鍵：記憶體位元組用內容雜湊，磁碟檔案用（路徑, mtime）免重讀
+        if image_bytes is not None:
+            cache_key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        else:
+            try:
+                cache_key = (image_path, os.path.getmtime(image_path))
+            except OSError:
+                cache_key = None
+
+        now = time.time()
+        if cache_key is not None:
+            with self._img_cache_lock:
+                cached = self._img_cache.get(cache_key)
+                if cached is not None and now - cached[1] < self._IMG_CACHE_TTL_SECONDS:
+                    return cached[0]
 
-            response = requests.post(
+        try:
+            if image_bytes is None:
+                with open(image_path, 'rb') as f:
+                    image_bytes = f.read()
+
+            # multipart 直接傳原始二進位：省去 base64 編碼
+            # 與其 4/3 倍的傳輸量（位元組保留在變數中供重試重送）
+            response = self._post_with_retry(
+                self._imgbb_session,
                 'https://api.imgbb.com/1/upload',
                 data={
                     'key': api_key,
-                    'image': image_data,
                     'expiration': 600  # 圖片 10 分鐘後過期
                 },
-                timeout=30
+                files={'image': (os.path.basename(image_path), image_bytes)},
+                timeout=self._IMGBB_TIMEOUT
             )
 
             if response.status_code == 200:
                 result = response.json()
                 if result.get('success'):
-                    return result['data']['url']
+                    image_url = result['data']['url']
+                    if cache_key is not None:
+                        with self._img_cache_lock:
+                            self._img_cache[cache_key] = (image_url, now)
+                            while len(self._img_cache) > self._IMG_CACHE_MAX_ENTRIES:
+                                self._img_cache.popitem(last=False)
+                    return image_url
 
             print(f"❌ 上傳圖片失敗: {response.text}")
             return None
@@ -481,13 +690,16 @@ class LineBotNotifier:
 
     def send_image_message(self,
                            image_path: str,
-                           user_id: Optional[str] = None) -> bool:
+                           user_id: Optional[str] = None,
+                           image_bytes: Optional[bytes] = None) -> bool:
         """
         發送圖片訊息
 
         Args:
             image_path: 本地圖片路徑
             user_id: 目標用戶 ID
+            image_bytes: 已編碼的圖片位元組；提供時直接上傳，
+                         不需等待檔案寫入磁碟或重新讀檔
 
         Returns:
             是否發送成功
@@ -497,12 +709,12 @@ class LineBotNotifier:
             print("錯誤：未提供目標用戶 ID")
             return False
 
-        if not os.path.exists(image_path):
+        if image_bytes is None and not os.path.exists(image_path):
             print(f"錯誤：圖片檔案不存在: {image_path}")
             return False
 
         # 上傳圖片取得 URL
-        image_url = self._upload_image_to_imgbb(image_path)
+        image_url = self._upload_image_to_imgbb(image_path, image_bytes=image_bytes)
 
         if not image_url:
             # 如果上傳失敗，發送提示訊息
@@ -511,53 +723,35 @@ class LineBotNotifier:
                 target_user
             )
 
-        payload = {
-            "to": target_user,
-            "messages": [
-                {
-                    "type": "image",
-                    "originalContentUrl": image_url,
-                    "previewImageUrl": image_url
-                }
-            ]
-        }
-
-        try:
-            response = requests.post(
-                self.PUSH_MESSAGE_URL,
-                headers=self.headers,
-                json=payload,
-                timeout=15
-            )
-
-            if response.status_code == 200:
-                print(f"✅ 圖片訊息發送成功")
-                return True
-            else:
-                print(f"❌ 圖片訊息發送失敗: {response.status_code}")
-                print(f"錯誤訊息: {response.text}")
-                return False
+        messages = [
+            {
+                "type": "image",
+                "originalContentUrl": image_url,
+                "previewImageUrl": image_url
+            }
+        ]
 
-        except requests.exceptions.Timeout:
-            print(f"❌ 發送圖片訊息逾時")
-            return False
-        except Exception as e:
-            print(f"❌ 發送圖片訊息時發生錯誤: {e}")
-            return False
+        return self._do_push(target_user, messages, "圖片訊息")
 
     @staticmethod
+    @functools.lru_cache(maxsize=4)
     def load_config(config_path: str) -> dict:
         """
         從設定檔載入 LINE Bot 設定
 
+        結果以路徑為鍵快取（設定在執行期間不變，
+        重複建構通知器時第二次起為 O(1)）；
+        安裝 orjson 時以其解析，較標準庫快約 5 倍。
+
         Args:
             config_path: 設定檔路徑
 
         Returns:
             設定字典
         """
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        with open(config_path, 'rb') as f:
+            raw = f.read()
+        config = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
         return config.get('line_bot', {})
 
 
@@ -1,5 +1,6 @@
 from .detector import PoseDetector
 from .fall_detector import FallDetector, DetectionResult, AlertSeverity
+from .keypoints import KP
 from .utils import (
     calculate_angle_from_vertical,
     calculate_torso_angle,
@@ -10,6 +11,7 @@ from .utils import (
     calculate_head_height_ratio,
     calculate_center_shift,
     get_all_body_angles,
+    get_all_body_angles_array,
     AngleTracker
 )
 
@@ -18,6 +20,7 @@ __all__ = [
     'FallDetector',
     'DetectionResult',
     'AlertSeverity',
+    'KP',
     'calculate_angle_from_vertical',
     'calculate_torso_angle',
     'calculate_shoulder_angle',
@@ -27,5 +30,6 @@ __all__ = [
     'calculate_head_height_ratio',
     'calculate_center_shift',
     'get_all_body_angles',
+    'get_all_body_angles_array',
     'AngleTracker'
 ]
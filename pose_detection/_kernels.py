@@ -0,0 +1,76 @@
+"""
+跌倒偵測數值核心 - 熱路徑的純數值運算
+安裝 numba 時以 @njit 編譯為原生碼，未安裝時退回純 Python 實作（介面相同）
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba 為選用的加速依賴
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """numba 未安裝時的替代裝飾器（直接返回原函式）"""
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+# MediaPipe 關鍵點索引（取自 keypoints.KP；njit 核心內使用純 int）
+from .keypoints import KP
+
+NOSE = int(KP.NOSE)
+LEFT_SHOULDER = int(KP.LEFT_SHOULDER)
+RIGHT_SHOULDER = int(KP.RIGHT_SHOULDER)
+LEFT_HIP = int(KP.LEFT_HIP)
+RIGHT_HIP = int(KP.RIGHT_HIP)
+
+
+# 注意：不可加 fastmath —— 缺少的關鍵點以 NaN 傳入，輸出的 NaN 在
+# 下游轉回 None；fastmath 的 no-NaN 假設會讓這個契約失效
+@njit(cache=True)
+def fall_metrics(lm, inv_frame_height):
+    """
+    從 (33, 3) 關鍵點陣列計算跌倒偵測所需的各項指標
+
+    Args:
+        lm: (33, 3) float32 關鍵點陣列 [x 像素, y 像素, 可見度]
+        inv_frame_height: 畫面高度的倒數（1.0 / frame_height）
+
+    Returns:
+        (torso_angle, head_height, center_x, center_y)
+        torso_angle: 軀幹相對垂直線的角度（度數）
+        head_height: 鼻子的正規化高度比例
+        center_x / center_y: 身體中心（肩膀中點與左右髖的三角形重心）
+    """
+    # 肩膀中點與髖部中點
+    shoulder_mid_x = (lm[LEFT_SHOULDER, 0] + lm[RIGHT_SHOULDER, 0]) * 0.5
+    shoulder_mid_y = (lm[LEFT_SHOULDER, 1] + lm[RIGHT_SHOULDER, 1]) * 0.5
+    hip_mid_x = (lm[LEFT_HIP, 0] + lm[RIGHT_HIP, 0]) * 0.5
+    hip_mid_y = (lm[LEFT_HIP, 1] + lm[RIGHT_HIP, 1]) * 0.5
+
+    # 軀幹角度：肩膀中點到髖部中點相對垂直線的夾角
+    dx = hip_mid_x - shoulder_mid_x
+    dy = hip_mid_y - shoulder_mid_y
+    torso_angle = math.degrees(math.atan2(abs(dx), abs(dy)))
+
+    # 頭部高度比例（0 = 頂部，1 = 底部）
+    head_height = lm[NOSE, 1] * inv_frame_height
+
+    # 三角形重心法的身體中心
+    center_x = (shoulder_mid_x + lm[LEFT_HIP, 0] + lm[RIGHT_HIP, 0]) / 3.0
+    center_y = (shoulder_mid_y + lm[LEFT_HIP, 1] + lm[RIGHT_HIP, 1]) / 3.0
+
+    return torso_angle, head_height, center_x, center_y
+
+
+def warmup():
+    """預先觸發 JIT 編譯，避免第一幀出現編譯延遲"""
+    fall_metrics(np.zeros((33, 3), np.float32), 1.0)
@@ -3,11 +3,29 @@
 提供即時人體骨架辨識功能
 """
 
-import cv2
-import mediapipe as mp
+import queue
+import importlib
+import threading
+
 import numpy as np
 from typing import Optional, Tuple, Dict, List
 
+from .keypoints import KP_BY_NAME
+
+# 重依賴延遲載入：mediapipe 冷啟動要數秒（TFLite/protobuf/abseil），
+# cv2 也要約半秒；只使用 FallDetector / AngleTracker 的程式不必付這筆成本
+cv2 = None
+mp = None
+
+
+def _load_heavy_deps():
+    """實際建構 PoseDetector 時才載入 cv2 與 mediapipe"""
+    global cv2, mp
+    if cv2 is None:
+        cv2 = importlib.import_module('cv2')
+    if mp is None:
+        mp = importlib.import_module('mediapipe')
+
 
 class PoseDetector:
     """
@@ -15,42 +33,8 @@ class PoseDetector:
     使用 MediaPipe Pose 進行骨架辨識
     """
 
-    # MediaPipe Pose 關鍵點索引
-    LANDMARKS = {
-        'nose': 0,
-        'left_eye_inner': 1,
-        'left_eye': 2,
-        'left_eye_outer': 3,
-        'right_eye_inner': 4,
-        'right_eye': 5,
-        'right_eye_outer': 6,
-        'left_ear': 7,
-        'right_ear': 8,
-        'mouth_left': 9,
-        'mouth_right': 10,
-        'left_shoulder': 11,
-        'right_shoulder': 12,
-        'left_elbow': 13,
-        'right_elbow': 14,
-        'left_wrist': 15,
-        'right_wrist': 16,
-        'left_pinky': 17,
-        'right_pinky': 18,
-        'left_index': 19,
-        'right_index': 20,
-        'left_thumb': 21,
-        'right_thumb': 22,
-        'left_hip': 23,
-        'right_hip': 24,
-        'left_knee': 25,
-        'right_knee': 26,
-        'left_ankle': 27,
-        'right_ankle': 28,
-        'left_heel': 29,
-        'right_heel': 30,
-        'left_foot_index': 31,
-        'right_foot_index': 32
-    }
+    # MediaPipe Pose 關鍵點索引（以 keypoints.KP 為唯一定義來源）
+    LANDMARKS = dict(KP_BY_NAME)
 
     # 骨架連線定義（用於繪製骨架線段）
     SKELETON_CONNECTIONS = [
@@ -78,20 +62,50 @@ class PoseDetector:
         ('right_knee', 'right_ankle'),
     ]
 
+    # 連線的整數索引版本：類別定義時轉換一次，
+    # 繪製迴圈直接以 int 索引陣列，免去每幀數十次字串雜湊
+    # （用明確迴圈建構：類別主體中的生成式看不到類別層級名稱）
+    SKELETON_CONNECTIONS_IDX = []
+    for _start, _end in SKELETON_CONNECTIONS:
+        SKELETON_CONNECTIONS_IDX.append((LANDMARKS[_start], LANDMARKS[_end]))
+    SKELETON_CONNECTIONS_IDX = tuple(SKELETON_CONNECTIONS_IDX)
+    del _start, _end
+
+    # 支援的推論後端
+    SUPPORTED_BACKENDS = ('mediapipe_cpu',)
+
     def __init__(self,
                  static_image_mode: bool = False,
-                 model_complexity: int = 1,
+                 model_complexity: int = 0,
                  min_detection_confidence: float = 0.5,
-                 min_tracking_confidence: float = 0.5):
+                 min_tracking_confidence: float = 0.5,
+                 backend: str = 'mediapipe_cpu',
+                 inference_resolution: Optional[Tuple[int, int]] = None):
         """
         初始化姿勢偵測器
 
         Args:
             static_image_mode: 是否為靜態圖片模式
-            model_complexity: 模型複雜度 (0, 1, 2)
+            model_complexity: 模型複雜度 (0, 1, 2)；預設 0（Lite 模型），
+                              CPU 上約快 2-3 倍，粗略體態判斷的精度足夠
             min_detection_confidence: 最小偵測信心度
             min_tracking_confidence: 最小追蹤信心度
+            backend: 推論後端（目前支援 'mediapipe_cpu'；
+                     GPU 後端需要特製的 mediapipe 版本，指定不支援的
+                     後端時會回退到 CPU 並顯示警告）
+            inference_resolution: 推論前先縮小到的 (寬, 高)，例如 (480, 360)；
+                                  關鍵點為正規化座標，縮小不影響下游的
+                                  像素換算。None 表示不在偵測器內縮放
+                                  （呼叫端可自行縮放，如 app.py 的 detect_scale）
         """
+        _load_heavy_deps()
+
+        if backend not in self.SUPPORTED_BACKENDS:
+            print(f"⚠️ 不支援的推論後端 '{backend}'，回退到 mediapipe_cpu")
+            print("   （GPU 推論需安裝支援 GPU graph 的 mediapipe 建置）")
+            backend = 'mediapipe_cpu'
+        self.backend = backend
+
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
@@ -106,24 +120,84 @@ class PoseDetector:
         self.results = None
         self.landmarks = None
 
-    def detect(self, frame: np.ndarray) -> bool:
+        # 關鍵點輸出緩衝區（每幀重複使用，避免配置器壓力）
+        self._lm_buf = np.empty((len(self.LANDMARKS), 3), np.float32)
+
+        # BGR→RGB 轉換的內部緩衝區（呼叫端未提供 rgb_out 時延遲配置）
+        self._rgb_buf: Optional[np.ndarray] = None
+
+        # 推論輸入縮放（含重複使用的縮圖緩衝區）
+        self._infer_size = inference_resolution
+        self._infer_buf: Optional[np.ndarray] = None
+
+        # 每幀一次走訪快取的正規化座標與可見度，
+        # 各存取方法改以陣列運算取值，不再逐點觸碰 protobuf 物件
+        self._xy = np.empty((len(self.LANDMARKS), 2), np.float32)
+        self._vis = np.empty(len(self.LANDMARKS), np.float32)
+
+    def detect(self, frame: np.ndarray, rgb_out: Optional[np.ndarray] = None) -> bool:
         """
         偵測畫面中的人體姿勢
 
         Args:
             frame: BGR 格式的影像
+            rgb_out: 可重複使用的 RGB 輸出緩衝區（尺寸須與 frame 相同）；
+                     未提供時使用內部延遲配置的緩衝區，同樣避免每幀重新配置
 
         Returns:
             是否偵測到人體
         """
-        # 轉換為 RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # 推論輸入縮放：大畫面先縮到 inference_resolution，
+        # 色彩轉換與模型前處理都在小圖上進行
+        if (self._infer_size is not None
+                and frame.shape[1] > self._infer_size[0]):
+            infer_shape = (self._infer_size[1], self._infer_size[0], 3)
+            if self._infer_buf is None or self._infer_buf.shape != infer_shape:
+                self._infer_buf = np.empty(infer_shape, frame.dtype)
+            cv2.resize(frame, self._infer_size, dst=self._infer_buf,
+                       interpolation=cv2.INTER_AREA)
+            frame = self._infer_buf
+            if rgb_out is not None and rgb_out.shape != frame.shape:
+                rgb_out = None  # 呼叫端緩衝區尺寸不符，改用內部緩衝
+
+        # 轉換為 RGB（寫入呼叫端或內部的重複使用緩衝區）
+        if rgb_out is None:
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty_like(frame)
+            rgb_out = self._rgb_buf
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_out)
+
+        return self.detect_rgb(rgb_out)
+
+    def detect_rgb(self, rgb_frame: np.ndarray) -> bool:
+        """
+        偵測畫面中的人體姿勢（RGB 輸入，跳過色彩轉換）
+
+        擷取端若已能直接供應 RGB（例如 GStreamer 管線
+        `videoconvert ! video/x-raw,format=RGB`），用此入口可
+        完全省去每幀的 BGR→RGB 轉換。
+
+        Args:
+            rgb_frame: RGB 格式的影像
 
-        # 進行姿勢偵測
+        Returns:
+            是否偵測到人體
+        """
+        # 進行姿勢偵測（標記唯讀讓 MediaPipe 可直接引用而不複製）
+        rgb_frame.flags.writeable = False
         self.results = self.pose.process(rgb_frame)
+        rgb_frame.flags.writeable = True
 
         if self.results.pose_landmarks:
             self.landmarks = self.results.pose_landmarks.landmark
+
+            # 單次走訪 protobuf 關鍵點，之後全部走 NumPy 陣列
+            xy = self._xy
+            vis = self._vis
+            for i, landmark in enumerate(self.landmarks):
+                xy[i, 0] = landmark.x
+                xy[i, 1] = landmark.y
+                vis[i] = landmark.visibility
             return True
 
         self.landmarks = None
@@ -151,10 +225,9 @@ class PoseDetector:
             return None
 
         idx = self.LANDMARKS[landmark_name]
-        landmark = self.landmarks[idx]
 
-        x = int(landmark.x * frame_width)
-        y = int(landmark.y * frame_height)
+        x = int(self._xy[idx, 0] * frame_width)
+        y = int(self._xy[idx, 1] * frame_height)
 
         return (x, y)
 
@@ -171,18 +244,38 @@ class PoseDetector:
         Returns:
             關鍵點名稱與座標的字典
         """
-        landmarks_dict = {}
+        if self.landmarks is None:
+            return {}
+
+        # 一次陣列乘法算出全部 33 點的像素座標，再單趟 zip 組字典
+        pixels = (self._xy * np.array((frame_width, frame_height),
+                                      np.float32)).astype(np.int32)
+        return dict(zip(self.LANDMARKS, map(tuple, pixels.tolist())))
+
+    def get_landmark_array(self,
+                           frame_width: int,
+                           frame_height: int) -> Optional[np.ndarray]:
+        """
+        取得所有關鍵點的 (33, 3) 陣列 [x 像素, y 像素, 可見度]
+
+        寫入的是內部預先配置的緩衝區並回傳其視圖；
+        內容會在下一次偵測後被覆寫，呼叫端不應跨幀保留參照。
 
+        Args:
+            frame_width: 畫面寬度
+            frame_height: 畫面高度
+
+        Returns:
+            (33, 3) float32 陣列，若尚未偵測到人體則返回 None
+        """
         if self.landmarks is None:
-            return landmarks_dict
+            return None
 
-        for name, idx in self.LANDMARKS.items():
-            landmark = self.landmarks[idx]
-            x = int(landmark.x * frame_width)
-            y = int(landmark.y * frame_height)
-            landmarks_dict[name] = (x, y)
+        buf = self._lm_buf
+        np.multiply(self._xy, (frame_width, frame_height), out=buf[:, :2])
+        buf[:, 2] = self._vis
 
-        return landmarks_dict
+        return buf
 
     def get_landmark_visibility(self, landmark_name: str) -> float:
         """
@@ -200,8 +293,7 @@ class PoseDetector:
         if landmark_name not in self.LANDMARKS:
             return 0.0
 
-        idx = self.LANDMARKS[landmark_name]
-        return self.landmarks[idx].visibility
+        return float(self._vis[self.LANDMARKS[landmark_name]])
 
     def draw_skeleton(self,
                       frame: np.ndarray,
@@ -210,7 +302,8 @@ class PoseDetector:
                       point_color: Tuple[int, int, int] = (0, 255, 0),
                       line_color: Tuple[int, int, int] = (255, 255, 0),
                       point_radius: int = 5,
-                      line_thickness: int = 2) -> np.ndarray:
+                      line_thickness: int = 2,
+                      inplace: bool = False) -> np.ndarray:
         """
         在畫面上繪製骨架
 
@@ -222,38 +315,37 @@ class PoseDetector:
             line_color: 線段顏色 (BGR)
             point_radius: 關鍵點半徑
             line_thickness: 線段粗細
+            inplace: 直接畫在 frame 上（省去整張影像的複製；
+                     呼叫端不需保留乾淨原圖時適用）
 
         Returns:
             繪製後的影像
         """
-        output = frame.copy()
+        output = frame if inplace else frame.copy()
 
         if self.landmarks is None:
             return output
 
         h, w = frame.shape[:2]
-        landmarks_pos = self.get_all_landmarks(w, h)
+        pixels = (self._xy * np.array((w, h), np.float32)).astype(np.int32)
+        vis_ok = self._vis > 0.5
 
-        # 繪製骨架線段
+        # 繪製骨架線段：收集可見線段後以單次 polylines 畫出，
+        # 取代逐段 cv2.line 的多次 Python↔C 往返
         if draw_lines:
-            for start_name, end_name in self.SKELETON_CONNECTIONS:
-                if start_name in landmarks_pos and end_name in landmarks_pos:
-                    start_pos = landmarks_pos[start_name]
-                    end_pos = landmarks_pos[end_name]
-
-                    # 檢查可見度
-                    start_vis = self.get_landmark_visibility(start_name)
-                    end_vis = self.get_landmark_visibility(end_name)
-
-                    if start_vis > 0.5 and end_vis > 0.5:
-                        cv2.line(output, start_pos, end_pos, line_color, line_thickness)
-
-        # 繪製關鍵點
+            segments = [
+                pixels[[start_idx, end_idx]]
+                for start_idx, end_idx in self.SKELETON_CONNECTIONS_IDX
+                if vis_ok[start_idx] and vis_ok[end_idx]
+            ]
+            if segments:
+                cv2.polylines(output, segments, False,
+                              line_color, line_thickness)
+
+        # 繪製關鍵點（可見度過濾一次完成）
         if draw_points:
-            for name, pos in landmarks_pos.items():
-                visibility = self.get_landmark_visibility(name)
-                if visibility > 0.5:
-                    cv2.circle(output, pos, point_radius, point_color, -1)
+            for x, y in pixels[vis_ok].tolist():
+                cv2.circle(output, (x, y), point_radius, point_color, -1)
 
         return output
 
@@ -305,45 +397,90 @@ class PoseDetector:
         self.pose.close()
 
 
+def _put_latest(q: queue.Queue, item):
+    """放入單槽佇列；若已滿則丟棄舊項目，永遠保留最新的一筆"""
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            pass
+
+
 def main():
-    """測試骨架偵測功能"""
+    """測試骨架偵測功能（推論在背景執行緒，主執行緒只負責擷取與顯示）"""
+    _load_heavy_deps()
     cap = cv2.VideoCapture(0)
     detector = PoseDetector()
 
+    # 單槽佇列：推論趕不上擷取時直接丟棄舊幀，
+    # 延遲被限制在約一個畫面週期內，不會無限累積
+    in_q: queue.Queue = queue.Queue(maxsize=1)
+    out_q: queue.Queue = queue.Queue(maxsize=1)
+
+    def _infer_loop():
+        """推論執行緒：偵測並把骨架畫在幀上（MediaPipe 的 C++ 呼叫會釋放 GIL）"""
+        while True:
+            frame = in_q.get()
+            if frame is None:  # 結束哨兵
+                break
+
+            detected = detector.detect(frame)
+
+            if detected:
+                frame = detector.draw_skeleton(frame, inplace=True)
+
+                # 顯示頭部和身體中心
+                h, w = frame.shape[:2]
+                head_pos = detector.get_head_position(w, h)
+                center_pos = detector.get_body_center(w, h)
+
+                if head_pos:
+                    cv2.circle(frame, head_pos, 10, (0, 0, 255), -1)
+                    cv2.putText(frame, "Head", (head_pos[0] + 10, head_pos[1]),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+
+                if center_pos:
+                    cv2.circle(frame, center_pos, 10, (255, 0, 0), -1)
+                    cv2.putText(frame, "Center", (center_pos[0] + 10, center_pos[1]),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
+
+            _put_latest(out_q, frame)
+
+    worker = threading.Thread(target=_infer_loop, name='pose-infer', daemon=True)
+    worker.start()
+
     print("按 'q' 鍵退出")
 
+    display_frame = None
     while cap.isOpened():
         ret, frame = cap.read()
         if not ret:
             break
 
-        # 偵測姿勢
-        detected = detector.detect(frame)
-
-        # 繪製骨架
-        if detected:
-            frame = detector.draw_skeleton(frame)
+        # 送入最新一幀（若推論還在忙，舊幀會被丟棄）
+        _put_latest(in_q, frame)
 
-            # 顯示頭部和身體中心
-            h, w = frame.shape[:2]
-            head_pos = detector.get_head_position(w, h)
-            center_pos = detector.get_body_center(w, h)
+        # 取出最近完成的結果（可能比當前擷取舊一幀）
+        try:
+            display_frame = out_q.get_nowait()
+        except queue.Empty:
+            pass
 
-            if head_pos:
-                cv2.circle(frame, head_pos, 10, (0, 0, 255), -1)
-                cv2.putText(frame, "Head", (head_pos[0] + 10, head_pos[1]),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-
-            if center_pos:
-                cv2.circle(frame, center_pos, 10, (255, 0, 0), -1)
-                cv2.putText(frame, "Center", (center_pos[0] + 10, center_pos[1]),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-
-        cv2.imshow('Pose Detection', frame)
+        if display_frame is not None:
+            cv2.imshow('Pose Detection', display_frame)
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
+    _put_latest(in_q, None)
+    worker.join(timeout=2.0)
+
     detector.release()
     cap.release()
     cv2.destroyAllWindows()
@@ -3,18 +3,18 @@
 整合骨架偵測與角度計算，進行跌倒風險評估
 """
 
+import math
 import time
 from typing import Optional, Tuple, Dict, List
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 
+import numpy as np
+
 from .detector import PoseDetector
-from .utils import (
-    calculate_torso_angle,
-    calculate_body_center,
-    calculate_head_height_ratio,
-    AngleTracker
-)
+from .keypoints import KP, KP_BY_NAME
+from ._kernels import fall_metrics, warmup as _warmup_kernels
+from .utils import AngleTracker
 
 
 class AlertSeverity(Enum):
@@ -24,9 +24,15 @@ class AlertSeverity(Enum):
     SEVERE = 2    # 嚴重：傾斜角度 > 50 度
 
 
-@dataclass
+@dataclass(frozen=True)
 class DetectionResult:
-    """偵測結果資料結構"""
+    """偵測結果資料結構（slots 免去 __dict__，每秒 30 個實例的配置成本減半）"""
+
+    # 手動宣告 __slots__（dataclass 的 slots= 參數需 Python 3.10+，
+    # 專案支援 3.8+）
+    __slots__ = ('is_fall_detected', 'severity', 'torso_angle', 'head_height',
+                 'center_shift', 'trigger_reasons', 'timestamp', 'confidence')
+
     is_fall_detected: bool
     severity: AlertSeverity
     torso_angle: Optional[float]
@@ -37,6 +43,30 @@ class DetectionResult:
     confidence: float
 
 
+# 觸發條件代碼與對應的說明文字模板（字串只在真正觸發警報時才格式化）
+_TRIGGER_TORSO = 0
+_TRIGGER_HEAD = 1
+_TRIGGER_CENTER = 2
+
+_TRIGGER_TEMPLATES = (
+    "軀幹傾斜角度異常: %.1f°",
+    "頭部高度突然下降",
+    "身體中心大幅偏移",
+)
+
+# 觸發位元遮罩保留最近 64 幀
+_MASK64 = (1 << 64) - 1
+
+# detect_batch 回傳的結構化陣列欄位
+BATCH_RESULT_DTYPE = np.dtype([
+    ('torso_angle', np.float32),
+    ('head_height', np.float32),
+    ('center_x', np.float32),
+    ('center_y', np.float32),
+    ('severity', np.int8),
+])
+
+
 class FallDetector:
     """
     跌倒偵測器 - 整合多項指標進行跌倒判斷
@@ -52,6 +82,25 @@ class FallDetector:
     - 多指標交叉驗證
     """
 
+    __slots__ = (
+        'torso_angle_threshold', 'head_drop_threshold', 'center_shift_threshold',
+        'consecutive_frames', 'cooldown_seconds', 'mild_angle_range',
+        'severe_angle_min', '_angle_thresholds', '_severity_levels',
+        'angle_tracker', '_trigger_mask', '_window_mask',
+        'consecutive_detections', 'last_alert_time',
+        'baseline_head_height', 'baseline_center', 'is_calibrated',
+        '_status_key', '_status_text',
+        '_last_frame_height', '_inv_frame_height',
+        '_memo_key', '_memo_result', '_pts_buf',
+    )
+
+    # 狀態文字的 % 模板（% 格式化在此類固定樣板上比 f-string 便宜）
+    _FMT_TORSO = "軀幹角度: %.1f°"
+    _FMT_HEAD = "頭部高度: %.2f"
+    _FMT_SHIFT = "中心位移: %.1fpx"
+    _FMT_CONSECUTIVE = "連續偵測: %d/%d"
+    _FMT_ALERT = "⚠️ 警報: %s (%.0f%%)"
+
     def __init__(self,
                  torso_angle_threshold: float = 35.0,
                  head_drop_threshold: float = 0.15,
@@ -80,20 +129,49 @@ class FallDetector:
         self.mild_angle_range = mild_angle_range
         self.severe_angle_min = severe_angle_min
 
+        # 角度分級改用已排序閾值表 + searchsorted，判斷過程無條件分支
+        self._angle_thresholds = np.array(
+            [mild_angle_range[0], severe_angle_min], dtype=np.float32)
+        self._severity_levels = (AlertSeverity.NONE, AlertSeverity.MILD,
+                                 AlertSeverity.SEVERE)
+
         # 追蹤器
         self.angle_tracker = AngleTracker(history_size=30)
 
-        # 連續偵測計數
+        # 連續偵測：最近 64 幀的觸發旗標存成一個整數位元遮罩，
+        # 每幀 shift-and-OR 寫入，窗口判斷為位元運算 + popcount
+        self._trigger_mask = 0
+        self._window_mask = (1 << consecutive_frames) - 1
         self.consecutive_detections = 0
 
-        # 最後警報時間
-        self.last_alert_time = 0
+        # 最後警報時間（monotonic 時基，-inf 表示尚未觸發過警報）
+        self.last_alert_time = -math.inf
 
         # 基準線（正常站立時的數值）
         self.baseline_head_height: Optional[float] = None
         self.baseline_center: Optional[Tuple[int, int]] = None
         self.is_calibrated = False
 
+        # 狀態文字的時間性記憶：相同指標連續數幀重繪時直接重用字串
+        self._status_key = None
+        self._status_text = ""
+
+        # 畫面高度的倒數快取：影片中高度固定，每幀除法換成乘法
+        self._last_frame_height = 0
+        self._inv_frame_height = 0.0
+
+        # 靜止幀的時間性記憶：關鍵點量化到 4 像素後不變且前次無任何
+        # 觸發時，整條偵測管線可以跳過（量化粒度即關鍵點雜訊底）
+        self._memo_key = None
+        self._memo_result: Optional[DetectionResult] = None
+
+        # 跨幀重用的 (33, 3) 關鍵點緩衝，字典/遮罩輸入都先填進這裡，
+        # 免去每幀的小物件配置
+        self._pts_buf = np.empty((33, 3), dtype=np.float32)
+
+        # 預先觸發數值核心的 JIT 編譯，避免第一幀延遲
+        _warmup_kernels()
+
     def calibrate(self, head_height: float, center: Tuple[int, int]):
         """
         校準基準線（使用者正常站立時呼叫）
@@ -105,6 +183,7 @@ class FallDetector:
         self.baseline_head_height = head_height
         self.baseline_center = center
         self.is_calibrated = True
+        self.angle_tracker.set_head_baseline(head_height)
 
     def reset_calibration(self):
         """重置校準"""
@@ -112,6 +191,8 @@ class FallDetector:
         self.baseline_center = None
         self.is_calibrated = False
         self.angle_tracker.reset()
+        self._memo_key = None
+        self._memo_result = None
 
     def _check_torso_angle(self, angle: float) -> Tuple[bool, AlertSeverity]:
         """
@@ -123,34 +204,21 @@ class FallDetector:
         Returns:
             (是否異常, 嚴重程度)
         """
-        if angle >= self.severe_angle_min:
-            return True, AlertSeverity.SEVERE
-        elif angle >= self.mild_angle_range[0]:
-            return True, AlertSeverity.MILD
-        return False, AlertSeverity.NONE
+        # side='right' 保持與原本 >= 閾值的邊界行為一致，level 為 0/1/2
+        level = int(np.searchsorted(self._angle_thresholds, angle, side='right'))
+        return level > 0, self._severity_levels[level]
 
-    def _check_head_drop(self, current_height: float) -> bool:
+    def _check_head_drop(self) -> bool:
         """
         檢查頭部是否突然下降
 
-        Args:
-            current_height: 當前頭部高度比例
+        綜合指標（近期變化 vs 基準線差的一半）已在追蹤器 update 時
+        算好，這裡只剩單一門檻比較。
 
         Returns:
             是否偵測到頭部下降
         """
-        # 使用歷史變化檢測
-        height_change = self.angle_tracker.get_head_height_change()
-        if height_change is not None and height_change > self.head_drop_threshold:
-            return True
-
-        # 與基準線比較
-        if self.baseline_head_height is not None:
-            diff = current_height - self.baseline_head_height
-            if diff > self.head_drop_threshold * 2:  # 與基準線差異更大才觸發
-                return True
-
-        return False
+        return self.angle_tracker.get_head_drop_metric() > self.head_drop_threshold
 
     def _check_center_shift(self) -> bool:
         """
@@ -164,9 +232,13 @@ class FallDetector:
             return True
         return False
 
-    def _is_in_cooldown(self) -> bool:
-        """檢查是否在冷卻時間內"""
-        return (time.time() - self.last_alert_time) < self.cooldown_seconds
+    def _is_in_cooldown(self, now: float) -> bool:
+        """檢查是否在冷卻時間內
+
+        Args:
+            now: 當前 time.monotonic() 時間戳（由呼叫端傳入，免重複取時）
+        """
+        return (now - self.last_alert_time) < self.cooldown_seconds
 
     def _calculate_confidence(self, trigger_count: int, severity: AlertSeverity) -> float:
         """
@@ -206,13 +278,165 @@ class FallDetector:
         Returns:
             DetectionResult 偵測結果
         """
-        trigger_reasons = []
-        max_severity = AlertSeverity.NONE
+        # 時間性記憶：關鍵點量化後與前一幀相同，且前一幀無任何觸發，
+        # 直接重用前次結果（僅更新時間戳），跳過整條指標管線
+        key = (tuple(landmarks),
+               (np.array(list(landmarks.values()), dtype=np.int16) >> 2).tobytes())
+        if key == self._memo_key:
+            # 位元遮罩仍補進一個 0，讓連續觸發窗口正常衰減
+            self._trigger_mask = (self._trigger_mask << 1) & _MASK64
+            self.consecutive_detections = bin(self._trigger_mask
+                                              & self._window_mask).count('1')
+            return replace(self._memo_result, timestamp=time.monotonic())
+
+        # 把字典填進重用的 (33, 3) 緩衝，指標計算共用編譯核心的陣列路徑
+        buf = self._pts_buf
+        buf[:] = np.nan
+        for name, point in landmarks.items():
+            idx = KP_BY_NAME.get(name)
+            if idx is not None:
+                buf[idx, 0] = point[0]
+                buf[idx, 1] = point[1]
+                buf[idx, 2] = 1.0
+
+        result = self.detect_array(buf, frame_height)
+
+        # 只記住「完全無觸發」的幀：有觸發時時序邏輯（連續幀計數、
+        # 冷卻）每幀都有狀態演進，不能以舊結果代打
+        if result.confidence == 0.0 and not result.is_fall_detected:
+            self._memo_key = key
+            self._memo_result = result
+        else:
+            self._memo_key = None
+            self._memo_result = None
+
+        return result
+
+    def _get_inv_height(self, frame_height: int) -> float:
+        """取得畫面高度的倒數（高度改變時才重算）"""
+        if frame_height != self._last_frame_height:
+            self._last_frame_height = frame_height
+            self._inv_frame_height = 1.0 / frame_height
+        return self._inv_frame_height
+
+    def detect_array(self,
+                     landmark_array: np.ndarray,
+                     frame_height: int) -> DetectionResult:
+        """
+        進行跌倒偵測（(33, 3) 關鍵點陣列版本）
+
+        指標計算走編譯過的數值核心（安裝 numba 時為原生碼），
+        判斷邏輯與 detect() 完全相同。
 
-        # 計算各項指標
-        torso_angle = calculate_torso_angle(landmarks)
-        body_center = calculate_body_center(landmarks)
-        head_height = calculate_head_height_ratio(landmarks, frame_height)
+        Args:
+            landmark_array: PoseDetector.get_landmark_array 回傳的 (33, 3) 陣列
+            frame_height: 畫面高度
+
+        Returns:
+            DetectionResult 偵測結果
+        """
+        torso, head, center_x, center_y = fall_metrics(
+            landmark_array, self._get_inv_height(frame_height))
+
+        torso_angle = None if math.isnan(torso) else float(torso)
+        head_height = None if math.isnan(head) else float(head)
+        if math.isnan(center_x) or math.isnan(center_y):
+            body_center = None
+        else:
+            body_center = (int(center_x), int(center_y))
+
+        return self._evaluate(torso_angle, body_center, head_height)
+
+    def detect_pts(self,
+                   pts: np.ndarray,
+                   mask: np.ndarray,
+                   frame_height: int) -> DetectionResult:
+        """
+        進行跌倒偵測（(33, 2) 座標 + (33,) 可見度遮罩版本）
+
+        座標與遮罩寫入跨幀重用的內部緩衝後走陣列路徑，整個呼叫
+        不產生新的 ndarray 或小物件配置。
+
+        Args:
+            pts: (33, 2) 關鍵點像素座標
+            mask: (33,) 布林遮罩，False 表示該關鍵點缺少
+            frame_height: 畫面高度
+
+        Returns:
+            DetectionResult 偵測結果
+        """
+        buf = self._pts_buf
+        buf[:, :2] = pts
+        buf[:, 2] = mask
+        buf[~mask, :2] = np.nan  # 缺少的關鍵點以 NaN 傳遞到核心
+
+        return self.detect_array(buf, frame_height)
+
+    def detect_batch(self,
+                     landmark_batch: np.ndarray,
+                     frame_height: int,
+                     visibility_threshold: float = 0.5) -> np.ndarray:
+        """
+        批次計算多人／多幀的跌倒指標與嚴重程度分級
+
+        供多人場景或離線影片後處理使用：B 個人的軀幹角度以一次
+        arctan2、頭部高度以一次乘法、中心點以一次平均算完，Python
+        開銷攤提到整個批次。此方法為無狀態的單幀指標運算——連續幀
+        確認、冷卻時間等時序邏輯仍由逐人呼叫的 detect()/detect_array()
+        負責。
+
+        Args:
+            landmark_batch: (B, 33, 3) 關鍵點陣列（最後一欄為可見度），
+                            或 (B, 33, 2) 純座標陣列
+            frame_height: 畫面高度
+            visibility_threshold: 可見度閾值，低於此值的關鍵點視為缺少
+
+        Returns:
+            (B,) 結構化陣列（BATCH_RESULT_DTYPE）：torso_angle、
+            head_height、center_x、center_y 欄位在關鍵點缺少時為 NaN，
+            severity 為 0/1/2（對應 NONE/MILD/SEVERE，無法計算時為 0）
+        """
+        pts = landmark_batch[:, :, :2].astype(np.float32, copy=True)
+        if landmark_batch.shape[2] >= 3:
+            pts[landmark_batch[:, :, 2] < visibility_threshold] = np.nan
+
+        shoulder_mid = pts[:, (KP.LEFT_SHOULDER, KP.RIGHT_SHOULDER)].mean(axis=1)
+        hip_mid = pts[:, (KP.LEFT_HIP, KP.RIGHT_HIP)].mean(axis=1)
+
+        v = hip_mid - shoulder_mid
+        angles = np.degrees(np.arctan2(np.abs(v[:, 0]), np.abs(v[:, 1])))
+
+        heads = pts[:, KP.NOSE, 1] * np.float32(self._get_inv_height(frame_height))
+        centers = (shoulder_mid + pts[:, KP.LEFT_HIP] + pts[:, KP.RIGHT_HIP]) / 3.0
+
+        # NaN 在 searchsorted 會落到最高分級，需明確壓回 NONE
+        severity = np.searchsorted(self._angle_thresholds, angles,
+                                   side='right').astype(np.int8)
+        severity[np.isnan(angles)] = 0
+
+        out = np.empty(len(landmark_batch), dtype=BATCH_RESULT_DTYPE)
+        out['torso_angle'] = angles
+        out['head_height'] = heads
+        out['center_x'] = centers[:, 0]
+        out['center_y'] = centers[:, 1]
+        out['severity'] = severity
+        return out
+
+    def _evaluate(self,
+                  torso_angle: Optional[float],
+                  body_center: Optional[Tuple[int, int]],
+                  head_height: Optional[float]) -> DetectionResult:
+        """依據當前幀的各項指標執行共用的警報判斷邏輯"""
+        # 每幀只取一次時間；monotonic 不受系統時鐘跳動影響冷卻判斷
+        now = time.monotonic()
+        # 高頻存取的屬性先綁成區域變數（LOAD_FAST 取代逐次屬性查找）
+        severity_none = AlertSeverity.NONE
+        severity_mild = AlertSeverity.MILD
+        # 條件檢查階段只記錄整數代碼，絕大多數幀不會升級成警報，
+        # 說明字串延後到真正觸發時才格式化
+        trigger_codes = []
+        add_code = trigger_codes.append
+        max_severity = severity_none
 
         # 更新追蹤器
         self.angle_tracker.update(torso_angle, body_center, head_height)
@@ -221,48 +445,59 @@ class FallDetector:
         if torso_angle is not None:
             is_abnormal, severity = self._check_torso_angle(torso_angle)
             if is_abnormal:
-                trigger_reasons.append(f"軀幹傾斜角度異常: {torso_angle:.1f}°")
+                add_code(_TRIGGER_TORSO)
                 if severity.value > max_severity.value:
                     max_severity = severity
 
         # 條件 2：檢查頭部下降
         if head_height is not None:
-            if self._check_head_drop(head_height):
-                trigger_reasons.append("頭部高度突然下降")
-                if max_severity == AlertSeverity.NONE:
-                    max_severity = AlertSeverity.MILD
+            if self._check_head_drop():
+                add_code(_TRIGGER_HEAD)
+                if max_severity is severity_none:
+                    max_severity = severity_mild
 
         # 條件 3：檢查身體中心偏移
         if self._check_center_shift():
-            trigger_reasons.append("身體中心大幅偏移")
-            if max_severity == AlertSeverity.NONE:
-                max_severity = AlertSeverity.MILD
+            add_code(_TRIGGER_CENTER)
+            if max_severity is severity_none:
+                max_severity = severity_mild
 
         # 判斷是否觸發警報
-        has_trigger = len(trigger_reasons) > 0
+        has_trigger = len(trigger_codes) > 0
 
-        if has_trigger:
-            self.consecutive_detections += 1
-        else:
-            self.consecutive_detections = max(0, self.consecutive_detections - 1)
+        # shift-and-OR 寫入位元遮罩，窗口內觸發幀數即 popcount
+        # （bin().count 取代 int.bit_count：後者需 Python 3.10+）
+        self._trigger_mask = ((self._trigger_mask << 1) | has_trigger) & _MASK64
+        window_bits = self._trigger_mask & self._window_mask
+        self.consecutive_detections = bin(window_bits).count('1')
 
-        # 多條件交叉驗證（至少 2 個條件或連續多幀）
+        # 多條件交叉驗證（至少 2 個條件或連續多幀全數觸發）
         should_alert = False
-        if len(trigger_reasons) >= 2:
+        if len(trigger_codes) >= 2:
             should_alert = True
-        elif self.consecutive_detections >= self.consecutive_frames:
+        elif window_bits == self._window_mask:
             should_alert = True
 
         # 檢查冷卻時間
-        if should_alert and self._is_in_cooldown():
+        if should_alert and self._is_in_cooldown(now):
             should_alert = False
 
         # 如果觸發警報，更新最後警報時間
         if should_alert:
-            self.last_alert_time = time.time()
+            self.last_alert_time = now
 
         # 計算信心度
-        confidence = self._calculate_confidence(len(trigger_reasons), max_severity)
+        confidence = self._calculate_confidence(len(trigger_codes), max_severity)
+
+        # 觸發警報時才把代碼展開成人類可讀的說明文字
+        if should_alert:
+            trigger_reasons = [
+                _TRIGGER_TEMPLATES[code] % torso_angle if code == _TRIGGER_TORSO
+                else _TRIGGER_TEMPLATES[code]
+                for code in trigger_codes
+            ]
+        else:
+            trigger_reasons = []
 
         return DetectionResult(
             is_fall_detected=should_alert,
@@ -271,7 +506,7 @@ class FallDetector:
             head_height=head_height,
             center_shift=self.angle_tracker.get_center_shift(),
             trigger_reasons=trigger_reasons,
-            timestamp=time.time(),
+            timestamp=now,
             confidence=confidence
         )
 
@@ -285,26 +520,36 @@ class FallDetector:
         Returns:
             狀態描述文字
         """
+        key = (result.torso_angle, result.head_height, result.center_shift,
+               self.consecutive_detections, result.is_fall_detected,
+               result.severity, result.confidence)
+        if key == self._status_key:
+            return self._status_text
+
         lines = []
 
         if result.torso_angle is not None:
-            lines.append(f"軀幹角度: {result.torso_angle:.1f}°")
+            lines.append(self._FMT_TORSO % result.torso_angle)
 
         if result.head_height is not None:
-            lines.append(f"頭部高度: {result.head_height:.2f}")
+            lines.append(self._FMT_HEAD % result.head_height)
 
         if result.center_shift is not None:
-            lines.append(f"中心位移: {result.center_shift:.1f}px")
+            lines.append(self._FMT_SHIFT % result.center_shift)
 
-        lines.append(f"連續偵測: {self.consecutive_detections}/{self.consecutive_frames}")
+        lines.append(self._FMT_CONSECUTIVE % (self.consecutive_detections,
+                                              self.consecutive_frames))
 
         if result.is_fall_detected:
             severity_text = "嚴重" if result.severity == AlertSeverity.SEVERE else "輕微"
-            lines.append(f"⚠️ 警報: {severity_text} ({result.confidence:.0%})")
+            lines.append(self._FMT_ALERT % (severity_text, result.confidence * 100))
 
-        return "\n".join(lines)
+        self._status_key = key
+        self._status_text = "\n".join(lines)
+        return self._status_text
 
     def force_reset_cooldown(self):
         """強制重置冷卻時間"""
-        self.last_alert_time = 0
+        self.last_alert_time = -math.inf
         self.consecutive_detections = 0
+        self._trigger_mask = 0
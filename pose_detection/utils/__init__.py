@@ -8,6 +8,7 @@ from .angle_calc import (
     calculate_head_height_ratio,
     calculate_center_shift,
     get_all_body_angles,
+    get_all_body_angles_array,
     AngleTracker
 )
 
@@ -21,5 +22,6 @@ __all__ = [
     'calculate_head_height_ratio',
     'calculate_center_shift',
     'get_all_body_angles',
+    'get_all_body_angles_array',
     'AngleTracker'
 ]
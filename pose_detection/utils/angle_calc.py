@@ -4,9 +4,13 @@
 """
 
 import numpy as np
+from collections import deque
 from typing import Tuple, Optional, Dict
 import math
 
+from . import angle_calc_numba as _kernels
+from ..keypoints import KP
+
 
 def calculate_angle_from_vertical(point1: Tuple[int, int], point2: Tuple[int, int]) -> float:
     """
@@ -24,17 +28,13 @@ def calculate_angle_from_vertical(point1: Tuple[int, int], point2: Tuple[int, in
     Returns:
         相對於垂直線的角度（度數），0° 表示完全垂直，90° 表示水平
     """
-    dx = point2[0] - point1[0]
-    dy = point2[1] - point1[1]
-
     # 計算向量與垂直向下方向的夾角
     # 垂直向下為 (0, 1)，但因為螢幕座標 y 軸向下為正
     # 所以我們計算的是向量與 y 軸正方向的夾角
-
-    angle_rad = math.atan2(abs(dx), abs(dy))
-    angle_deg = math.degrees(angle_rad)
-
-    return angle_deg
+    return _kernels.angle_from_vertical(
+        float(point2[0] - point1[0]),
+        float(point2[1] - point1[1])
+    )
 
 
 def calculate_torso_angle(landmarks: Dict[str, Tuple[int, int]]) -> Optional[float]:
@@ -51,24 +51,22 @@ def calculate_torso_angle(landmarks: Dict[str, Tuple[int, int]]) -> Optional[flo
     Returns:
         軀幹傾斜角度（度數），若無法計算則返回 None
     """
-    required_points = ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip']
-
-    for point in required_points:
-        if point not in landmarks:
-            return None
-
-    # 計算肩膀中點
-    shoulder_mid_x = (landmarks['left_shoulder'][0] + landmarks['right_shoulder'][0]) / 2
-    shoulder_mid_y = (landmarks['left_shoulder'][1] + landmarks['right_shoulder'][1]) / 2
-
-    # 計算髖部中點
-    hip_mid_x = (landmarks['left_hip'][0] + landmarks['right_hip'][0]) / 2
-    hip_mid_y = (landmarks['left_hip'][1] + landmarks['right_hip'][1]) / 2
-
-    shoulder_mid = (int(shoulder_mid_x), int(shoulder_mid_y))
-    hip_mid = (int(hip_mid_x), int(hip_mid_y))
+    # 直接取值並攔截 KeyError：四個關鍵點各只做一次字典雜湊
+    try:
+        left_shoulder = landmarks['left_shoulder']
+        right_shoulder = landmarks['right_shoulder']
+        left_hip = landmarks['left_hip']
+        right_hip = landmarks['right_hip']
+    except KeyError:
+        return None
 
-    return calculate_angle_from_vertical(shoulder_mid, hip_mid)
+    # 中點與角度在融合核心內一次算完
+    return _kernels.torso_angle(
+        float(left_shoulder[0]), float(left_shoulder[1]),
+        float(right_shoulder[0]), float(right_shoulder[1]),
+        float(left_hip[0]), float(left_hip[1]),
+        float(right_hip[0]), float(right_hip[1])
+    )
 
 
 def calculate_shoulder_angle(landmarks: Dict[str, Tuple[int, int]]) -> Optional[float]:
@@ -185,7 +183,8 @@ def calculate_body_center(landmarks: Dict[str, Tuple[int, int]]) -> Optional[Tup
 
 
 def calculate_head_height_ratio(landmarks: Dict[str, Tuple[int, int]],
-                                 frame_height: int) -> Optional[float]:
+                                 frame_height: int,
+                                 inv_height: Optional[float] = None) -> Optional[float]:
     """
     計算頭部高度相對於畫面高度的比例
 
@@ -194,6 +193,8 @@ def calculate_head_height_ratio(landmarks: Dict[str, Tuple[int, int]],
     Args:
         landmarks: 關鍵點座標字典
         frame_height: 畫面高度
+        inv_height: 畫面高度的倒數；影片中 frame_height 固定不變，
+                    呼叫端預先算好倒數可把每幀的除法換成乘法
 
     Returns:
         頭部高度比例 (0.0 ~ 1.0)，越接近 1 表示越低
@@ -204,6 +205,8 @@ def calculate_head_height_ratio(landmarks: Dict[str, Tuple[int, int]],
     nose_y = landmarks['nose'][1]
 
     # 返回正規化的高度比例（0 = 頂部，1 = 底部）
+    if inv_height is not None:
+        return nose_y * inv_height
     return nose_y / frame_height
 
 
@@ -219,30 +222,120 @@ def calculate_center_shift(current_center: Tuple[int, int],
     Returns:
         位移距離（像素）
     """
-    dx = current_center[0] - previous_center[0]
-    dy = current_center[1] - previous_center[1]
+    return _kernels.center_shift(
+        float(current_center[0] - previous_center[0]),
+        float(current_center[1] - previous_center[1])
+    )
+
 
-    return math.sqrt(dx * dx + dy * dy)
+# get_all_body_angles 批次計算使用的關鍵點順序
+KEYPOINT_ORDER = ('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip',
+                  'left_ankle', 'right_ankle')
+
+# 各線段的基準軸：True = 相對垂直線（軀幹、腿），False = 相對水平線（肩線、髖線）
+_BATCH_VERTICAL_AXIS = np.array([True, False, False, True, True])
 
 
 def get_all_body_angles(landmarks: Dict[str, Tuple[int, int]]) -> Dict[str, Optional[float]]:
     """
     取得所有身體角度資訊
 
+    將所需關鍵點一次打包成 NumPy 陣列，五條線段的角度以單一
+    arctan2 向量運算求出，避免逐一呼叫個別函式的直譯器開銷。
+
     Args:
         landmarks: 關鍵點座標字典
 
     Returns:
-        包含所有角度資訊的字典
+        包含所有角度資訊的字典（缺少關鍵點的角度為 None）
+    """
+    nan_point = (math.nan, math.nan)
+    pts = np.array([landmarks.get(name, nan_point) for name in KEYPOINT_ORDER],
+                   dtype=np.float32)
+
+    shoulder_mid = (pts[0] + pts[1]) * 0.5
+    hip_mid = (pts[2] + pts[3]) * 0.5
+
+    # 五條線段的向量：軀幹、肩線、髖線、左腿、右腿
+    vecs = np.stack([
+        hip_mid - shoulder_mid,
+        pts[1] - pts[0],
+        pts[3] - pts[2],
+        pts[4] - pts[2],
+        pts[5] - pts[3],
+    ])
+
+    abs_dx = np.abs(vecs[:, 0])
+    abs_dy = np.abs(vecs[:, 1])
+
+    # 垂直基準用 atan2(|dx|, |dy|)，水平基準用 atan2(|dy|, |dx|)
+    numerator = np.where(_BATCH_VERTICAL_AXIS, abs_dx, abs_dy)
+    denominator = np.where(_BATCH_VERTICAL_AXIS, abs_dy, abs_dx)
+    angles = np.degrees(np.arctan2(numerator, denominator))
+
+    # 缺少關鍵點時 NaN 會自然傳遞，於邊界轉回 None
+    values = [None if math.isnan(a) else float(a) for a in angles]
+
+    return {
+        'torso': values[0],
+        'shoulder': values[1],
+        'hip': values[2],
+        'left_leg': values[3],
+        'right_leg': values[4]
+    }
+
+
+# get_all_body_angles_array 使用的關鍵點索引（與 KEYPOINT_ORDER 對應）
+_KEYPOINT_ORDER_IDX = np.array([KP.LEFT_SHOULDER, KP.RIGHT_SHOULDER,
+                                KP.LEFT_HIP, KP.RIGHT_HIP,
+                                KP.LEFT_ANKLE, KP.RIGHT_ANKLE], dtype=np.intp)
+
+
+def get_all_body_angles_array(landmark_array: np.ndarray,
+                              visibility_threshold: float = 0.5) -> Dict[str, Optional[float]]:
+    """
+    取得所有身體角度資訊（(33, 3) 關鍵點陣列版本）
+
+    SoA 版本：直接以 KP 整數索引切片，不經過字典雜湊；
+    可見度低於閾值的關鍵點以 NaN 代入，結果在邊界轉回 None。
+
+    Args:
+        landmark_array: PoseDetector.get_landmark_array 回傳的 (33, 3) 陣列
+        visibility_threshold: 可見度閾值，低於此值視為缺少該關鍵點
+
+    Returns:
+        包含所有角度資訊的字典（缺少關鍵點的角度為 None）
     """
-    leg_angles = calculate_leg_angles(landmarks)
+    pts = landmark_array[_KEYPOINT_ORDER_IDX, :2].astype(np.float32, copy=True)
+    pts[landmark_array[_KEYPOINT_ORDER_IDX, 2] < visibility_threshold] = np.nan
+
+    shoulder_mid = (pts[0] + pts[1]) * 0.5
+    hip_mid = (pts[2] + pts[3]) * 0.5
+
+    # 五條線段的向量：軀幹、肩線、髖線、左腿、右腿
+    vecs = np.stack([
+        hip_mid - shoulder_mid,
+        pts[1] - pts[0],
+        pts[3] - pts[2],
+        pts[4] - pts[2],
+        pts[5] - pts[3],
+    ])
+
+    abs_dx = np.abs(vecs[:, 0])
+    abs_dy = np.abs(vecs[:, 1])
+
+    numerator = np.where(_BATCH_VERTICAL_AXIS, abs_dx, abs_dy)
+    denominator = np.where(_BATCH_VERTICAL_AXIS, abs_dy, abs_dx)
+    angles = np.degrees(np.arctan2(numerator, denominator))
+
+    values = [None if math.isnan(a) else float(a) for a in angles]
 
     return {
-        'torso': calculate_torso_angle(landmarks),
-        'shoulder': calculate_shoulder_angle(landmarks),
-        'hip': calculate_hip_angle(landmarks),
-        'left_leg': leg_angles['left_leg'],
-        'right_leg': leg_angles['right_leg']
+        'torso': values[0],
+        'shoulder': values[1],
+        'hip': values[2],
+        'left_leg': values[3],
+        'right_leg': values[4]
     }
 
 
@@ -259,9 +352,27 @@ class AngleTracker:
             history_size: 歷史記錄大小
         """
         self.history_size = history_size
-        self.torso_history = []
-        self.center_history = []
-        self.head_height_history = []
+        # deque(maxlen=) 滿了會自動淘汰最舊項目，避免每幀 pop(0) 的 O(N) 搬移
+        self.torso_history = deque(maxlen=history_size)
+        self.center_history = deque(maxlen=history_size)
+        self.head_height_history = deque(maxlen=history_size)
+
+        # 中心點另存一份環形 NumPy 陣列，位移計算可整批向量化
+        self._center_arr = np.empty((history_size, 2), dtype=np.int32)
+        self._center_count = 0
+
+        # 最近一次的變化量在 update() 寫入時順手算好，查詢即 O(1) 屬性讀取
+        self._last_angle_change: Optional[float] = None
+        self._last_shift: Optional[float] = None
+        self._last_head_change: Optional[float] = None
+
+        # 中心點歷史是否已達可計算位移的長度（暖機後即恆為 True）
+        self._center_ready = False
+
+        # 頭部下降綜合指標：取「近期變化」與「與基準線差的一半」較大者，
+        # 在 update() 時算好，下游只需一次門檻比較
+        self._baseline_head_height: Optional[float] = None
+        self._drop_metric = 0.0
 
     def update(self,
                torso_angle: Optional[float],
@@ -275,20 +386,34 @@ class AngleTracker:
             center: 身體中心點
             head_height: 頭部高度比例
         """
+        # 前一筆數值此刻就在手上，變化量在插入時一併算好快取
         if torso_angle is not None:
+            if self.torso_history:
+                self._last_angle_change = torso_angle - self.torso_history[-1]
             self.torso_history.append(torso_angle)
-            if len(self.torso_history) > self.history_size:
-                self.torso_history.pop(0)
 
         if center is not None:
+            if self._center_count > 0:
+                prev = self._center_arr[(self._center_count - 1) % self.history_size]
+                self._last_shift = math.hypot(float(center[0] - prev[0]),
+                                              float(center[1] - prev[1]))
+                self._center_ready = True
             self.center_history.append(center)
-            if len(self.center_history) > self.history_size:
-                self.center_history.pop(0)
+            self._center_arr[self._center_count % self.history_size] = center
+            self._center_count += 1
 
         if head_height is not None:
+            if self.head_height_history:
+                self._last_head_change = head_height - self.head_height_history[-1]
             self.head_height_history.append(head_height)
-            if len(self.head_height_history) > self.history_size:
-                self.head_height_history.pop(0)
+
+            # 綜合頭部下降指標（基準線差取半等價於「差異達兩倍門檻」）
+            drop = self._last_head_change if self._last_head_change is not None else 0.0
+            if self._baseline_head_height is not None:
+                half_baseline_diff = (head_height - self._baseline_head_height) * 0.5
+                if half_baseline_diff > drop:
+                    drop = half_baseline_diff
+            self._drop_metric = drop
 
     def get_average_torso_angle(self) -> Optional[float]:
         """取得平均軀幹角度"""
@@ -297,25 +422,29 @@ class AngleTracker:
         return sum(self.torso_history) / len(self.torso_history)
 
     def get_torso_angle_change_rate(self) -> Optional[float]:
-        """取得軀幹角度變化率"""
-        if len(self.torso_history) < 2:
-            return None
-        return self.torso_history[-1] - self.torso_history[-2]
+        """取得軀幹角度變化率（update 時已算好）"""
+        return self._last_angle_change
+
+    def _recent_centers(self, count: int) -> np.ndarray:
+        """依時間順序取出最近 count 筆中心點（環形索引展開）"""
+        indices = np.arange(self._center_count - count, self._center_count) % self.history_size
+        return self._center_arr[indices]
 
     def get_center_shift(self) -> Optional[float]:
-        """取得最近的中心點位移"""
-        if len(self.center_history) < 2:
-            return None
-        return calculate_center_shift(
-            self.center_history[-1],
-            self.center_history[-2]
-        )
+        """取得最近的中心點位移（update 時已算好）"""
+        return self._last_shift
 
     def get_head_height_change(self) -> Optional[float]:
-        """取得頭部高度變化"""
-        if len(self.head_height_history) < 2:
-            return None
-        return self.head_height_history[-1] - self.head_height_history[-2]
+        """取得頭部高度變化（update 時已算好）"""
+        return self._last_head_change
+
+    def set_head_baseline(self, baseline: Optional[float]):
+        """設定頭部高度基準線（校準時由 FallDetector 呼叫）"""
+        self._baseline_head_height = baseline
+
+    def get_head_drop_metric(self) -> float:
+        """取得頭部下降綜合指標（update 時已算好）"""
+        return self._drop_metric
 
     def get_max_center_shift(self, frames: int = 5) -> Optional[float]:
         """
@@ -327,23 +456,29 @@ class AngleTracker:
         Returns:
             最大位移距離
         """
-        if len(self.center_history) < 2:
+        # 暖機後此旗標恆為 True，免去每幀重算長度條件
+        if not self._center_ready:
             return None
 
-        check_frames = min(frames, len(self.center_history) - 1)
-        shifts = []
-
-        for i in range(-check_frames, 0):
-            shift = calculate_center_shift(
-                self.center_history[i],
-                self.center_history[i - 1]
-            )
-            shifts.append(shift)
+        available = min(self._center_count, self.history_size)
+        check_frames = min(frames, available - 1)
+        if check_frames <= 0:  # frames <= 0 時無區段可比，與基準版同樣回 None
+            return None
 
-        return max(shifts) if shifts else None
+        # 一次取出所需區段，相鄰差與距離以單一向量運算完成
+        recent = self._recent_centers(check_frames + 1)
+        diffs = np.diff(recent, axis=0)
+        return float(np.hypot(diffs[:, 0], diffs[:, 1]).max())
 
     def reset(self):
         """重置追蹤器"""
         self.torso_history.clear()
         self.center_history.clear()
         self.head_height_history.clear()
+        self._center_count = 0
+        self._last_angle_change = None
+        self._last_shift = None
+        self._last_head_change = None
+        self._center_ready = False
+        self._baseline_head_height = None
+        self._drop_metric = 0.0
@@ -0,0 +1,53 @@
+"""
+角度計算的 JIT 核心 - angle_calc 熱路徑的純量運算
+安裝 numba 時以 @njit 編譯為原生碼，未安裝時退回純 Python 實作（介面相同）
+"""
+
+import math
+
+from .._kernels import njit, HAS_NUMBA
+
+
+@njit(cache=True, fastmath=True)
+def angle_from_vertical(dx, dy):
+    """向量 (dx, dy) 相對垂直線的角度（度數）"""
+    return math.degrees(math.atan2(abs(dx), abs(dy)))
+
+
+@njit(cache=True, fastmath=True)
+def angle_from_horizontal(dx, dy):
+    """向量 (dx, dy) 相對水平線的角度（度數）"""
+    return math.degrees(math.atan2(abs(dy), abs(dx)))
+
+
+@njit(cache=True, fastmath=True)
+def torso_angle(lsx, lsy, rsx, rsy, lhx, lhy, rhx, rhy):
+    """
+    融合的軀幹角度核心：肩膀中點到髖部中點相對垂直線的夾角
+
+    中點與角度一次算完，避免在 Python 層來回打包座標 tuple
+    """
+    dx = (lhx + rhx) - (lsx + rsx)
+    dy = (lhy + rhy) - (lsy + rsy)
+    return math.degrees(math.atan2(abs(dx), abs(dy)))
+
+
+@njit(cache=True, fastmath=True)
+def center_shift(dx, dy):
+    """兩個中心點之間的位移距離（像素）
+
+    hypot 為單一 libm 呼叫，且中間值不會溢位/下溢
+    """
+    return math.hypot(dx, dy)
+
+
+def warmup():
+    """預先觸發 JIT 編譯，避免第一幀出現編譯延遲"""
+    angle_from_vertical(0.0, 1.0)
+    angle_from_horizontal(1.0, 0.0)
+    torso_angle(0.0, 0.0, 2.0, 0.0, 0.0, 2.0, 2.0, 2.0)
+    center_shift(3.0, 4.0)
+
+
+# 模組載入時即完成編譯，編譯成本不會落在視訊迴圈的第一幀
+warmup()